@@ -1,3 +1,4 @@
+from .grid import PackedGrid
 from .instance import MAPFInstance, instance_from_scen
 
-__all__ = ["MAPFInstance", "instance_from_scen"]
\ No newline at end of file
+__all__ = ["MAPFInstance", "PackedGrid", "instance_from_scen"]
\ No newline at end of file
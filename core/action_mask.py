@@ -0,0 +1,143 @@
+# mapf_env/core/action_mask.py
+
+from __future__ import annotations
+
+import weakref
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .actions import ACTION_DELTAS, MotionType, delta_table
+from .grid import GridLike, PackedGrid
+
+# id(grid) -> (weakref to grid, {motion: mask}); entries die with their grid
+_MASK_CACHE: Dict[int, Tuple[weakref.ref, Dict[str, np.ndarray]]] = {}
+
+
+def _compute_mask(grid: np.ndarray, motion: MotionType) -> np.ndarray:
+    H, W = grid.shape
+    # free cells with a blocked one-cell border, so off-grid moves read as walls
+    free = np.zeros((H + 2, W + 2), dtype=np.uint16)
+    free[1:-1, 1:-1] = np.asarray(grid) == 0
+
+    mask = np.zeros((H, W), dtype=np.uint16)
+    for a, (dr, dc) in enumerate(delta_table(motion)):
+        mask |= free[1 + dr : 1 + dr + H, 1 + dc : 1 + dc + W] << np.uint16(a)
+    return mask
+
+
+def _cached_masks(grid: np.ndarray) -> Optional[Dict[str, np.ndarray]]:
+    """The per-motion mask dict of `grid`, or None if it cannot be cached."""
+    key = id(grid)
+    entry = _MASK_CACHE.get(key)
+    if entry is None or entry[0]() is not grid:
+        try:
+            ref = weakref.ref(grid, lambda _, key=key: _MASK_CACHE.pop(key, None))
+        except TypeError:
+            return None  # not weak-referenceable
+        entry = (ref, {})
+        _MASK_CACHE[key] = entry
+    return entry[1]
+
+
+def legal_action_mask(grid: np.ndarray, motion: MotionType = "4") -> np.ndarray:
+    """
+    (H, W) uint16 bitmask: bit a of mask[r, c] is set iff action a moves an
+    agent at (r, c) onto a free in-bounds cell (bit 0, WAIT, = cell is free).
+
+    The mask is computed once per grid object and motion model and cached
+    while the grid is alive; it is read-only and assumes the grid is not
+    modified in place afterwards.
+    """
+    if motion not in ("4", "8"):
+        raise ValueError(f"motion must be '4' or '8', got {motion}")
+
+    masks = _cached_masks(grid)
+    if masks is None:
+        # not weak-referenceable: compute without caching
+        mask = _compute_mask(grid, motion)
+        mask.flags.writeable = False
+        return mask
+
+    if motion not in masks:
+        mask = _compute_mask(grid, motion)
+        mask.flags.writeable = False
+        masks[motion] = mask
+    return masks[motion]
+
+
+def set_legal_action_mask(grid: np.ndarray, motion: MotionType, mask: np.ndarray) -> None:
+    """
+    Make `legal_action_mask(grid, motion)` return `mask` (e.g. one mapped
+    from shared memory by a pool worker) instead of computing its own copy.
+    """
+    masks = _cached_masks(grid)
+    if masks is None:
+        raise ValueError("grid must be weak-referenceable to register a mask")
+    if mask.shape != grid.shape:
+        raise ValueError(f"mask shape {mask.shape} does not match grid {grid.shape}")
+    masks[motion] = mask
+
+
+def step_mask(grid: GridLike, motion: MotionType) -> Optional[np.ndarray]:
+    """
+    Flat (H * W,) legal-action mask for `illegal_moves`, or None for a
+    PackedGrid: its moves are checked against the packed bits, so no
+    2-byte-per-cell mask is built.
+    """
+    if isinstance(grid, PackedGrid):
+        return None
+    return legal_action_mask(grid, motion).reshape(-1)
+
+
+def illegal_moves(
+    grid: GridLike,
+    flat_mask: Optional[np.ndarray],
+    prev_flat: np.ndarray,
+    new_pos: np.ndarray,
+    actions: np.ndarray,
+) -> np.ndarray:
+    """
+    Bool array: the move of action ids `actions` from flat cells `prev_flat`
+    to `new_pos` leaves the grid or ends on an obstacle. `flat_mask` comes
+    from `step_mask(grid, motion)`.
+    """
+    if flat_mask is None:
+        return grid.is_blocked(new_pos[..., 0], new_pos[..., 1])
+    return ~is_legal(flat_mask[prev_flat], actions)
+
+
+def is_legal(mask_values: np.ndarray, actions: np.ndarray) -> np.ndarray:
+    """Bool array: action ids `actions` are legal given per-agent mask values."""
+    return ((mask_values >> np.asarray(actions, dtype=np.uint16)) & 1).astype(bool)
+
+
+def sample_legal_actions(
+    mask_values: np.ndarray, rng: np.random.Generator, motion: MotionType = "4"
+) -> np.ndarray:
+    """
+    Draw one action id per agent uniformly among its legal actions.
+
+    `mask_values` holds the mask entries of the agents' cells. Agents with
+    no legal action (only possible on a blocked cell) get WAIT.
+    """
+    num_actions = len(delta_table(motion))
+    bits = (mask_values[:, None] >> np.arange(num_actions, dtype=np.uint16)) & 1
+    ranks = np.cumsum(bits, axis=1)
+    counts = ranks[:, -1]
+    pick = (rng.random(len(mask_values)) * counts).astype(np.int64)
+    actions = np.argmax(ranks > pick[:, None], axis=1)
+    actions[counts == 0] = 0
+    return actions
+
+
+@lru_cache(maxsize=None)
+def legal_deltas(mask_value: int, motion: MotionType = "4") -> Tuple[Tuple[int, int], ...]:
+    """(dr, dc) moves (WAIT excluded) legal for one mask entry, in action-id order."""
+    num_actions = len(delta_table(motion))
+    return tuple(
+        (int(ACTION_DELTAS[a, 0]), int(ACTION_DELTAS[a, 1]))
+        for a in range(1, num_actions)
+        if (mask_value >> a) & 1
+    )
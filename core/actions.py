@@ -0,0 +1,112 @@
+# mapf_env/core/actions.py
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Literal, Tuple, Union
+
+import numpy as np
+
+PathLike = Union[str, Path]
+
+MotionType = Literal["4", "8"]
+
+# Row i holds the (dr, dc) of action id i (SPEC §5.1 order, diagonals last).
+ACTION_DELTAS = np.array(
+    [
+        (0, 0),    # WAIT
+        (0, 1),    # RIGHT
+        (1, 0),    # DOWN
+        (-1, 0),   # UP
+        (0, -1),   # LEFT
+        (1, 1),    # DOWN-RIGHT
+        (1, -1),   # DOWN-LEFT
+        (-1, 1),   # UP-RIGHT
+        (-1, -1),  # UP-LEFT
+    ],
+    dtype=np.int64,
+)
+ACTION_DELTAS.flags.writeable = False
+
+
+def delta_table(motion: MotionType) -> np.ndarray:
+    """Return an (A, 2) array: row a -> (dr, dc) of action a."""
+    return ACTION_DELTAS[:5] if motion == "4" else ACTION_DELTAS
+
+
+# ACTION_IDS[dr + 1, dc + 1] -> action id of the move (dr, dc)
+ACTION_IDS = np.zeros((3, 3), dtype=np.uint8)
+ACTION_IDS[ACTION_DELTAS[:, 0] + 1, ACTION_DELTAS[:, 1] + 1] = np.arange(
+    len(ACTION_DELTAS), dtype=np.uint8
+)
+ACTION_IDS.flags.writeable = False
+
+
+# ---------------------------------------------------------------
+# Action-encoded paths: starts (N, 2) + actions (T-1, N) uint8
+# ---------------------------------------------------------------
+def encode_actions(
+    paths: np.ndarray, motion: MotionType = "8"
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (T, N, 2) positions -> (starts (N, 2), actions (T-1, N) uint8).
+
+    Raises ValueError if some step is not a single `motion` move or wait,
+    since such a path has no action encoding.
+    """
+    paths = np.asarray(paths)
+    if paths.ndim != 3 or paths.shape[2] != 2 or paths.shape[0] == 0:
+        raise ValueError(f"paths must have shape (T, N, 2) with T >= 1; got {paths.shape}")
+
+    deltas = np.diff(paths.astype(np.int64, copy=False), axis=0)
+    num_actions = len(delta_table(motion))
+    near = np.all(np.abs(deltas) <= 1, axis=2)
+    ids = ACTION_IDS[np.where(near, deltas[..., 0] + 1, 1), np.where(near, deltas[..., 1] + 1, 1)]
+
+    bad = ~near | (ids >= num_actions)
+    if np.any(bad):
+        step, agent = np.argwhere(bad)[0]
+        raise ValueError(
+            f"agent {agent} moves by {tuple(int(d) for d in deltas[step, agent])} at "
+            f"t={step + 1}, which is not a {motion}-connected action"
+        )
+    return paths[0].copy(), ids
+
+
+def decode_actions(
+    starts: np.ndarray, actions: np.ndarray, dtype=np.int64
+) -> np.ndarray:
+    """(starts (N, 2), actions (T-1, N)) -> (T, N, 2) positions."""
+    starts = np.asarray(starts)
+    actions = np.asarray(actions)
+    if actions.ndim != 2 or starts.shape != (actions.shape[1], 2):
+        raise ValueError(
+            f"expected starts (N, 2) and actions (T-1, N); "
+            f"got {starts.shape} and {actions.shape}"
+        )
+    if actions.size and int(actions.max()) >= len(ACTION_DELTAS):
+        raise ValueError(f"unknown action id {int(actions.max())}")
+
+    paths = np.empty((actions.shape[0] + 1,) + starts.shape, dtype=dtype)
+    paths[0] = starts
+    np.cumsum(ACTION_DELTAS[actions], axis=0, out=paths[1:])
+    paths[1:] += starts
+    return paths
+
+
+def save_actions(
+    path: PathLike, starts: np.ndarray, actions: np.ndarray, motion: MotionType = "8"
+) -> None:
+    """Write an action-encoded path as .npz (starts, actions, motion)."""
+    np.savez(
+        path,
+        starts=np.asarray(starts),
+        actions=np.asarray(actions, dtype=np.uint8),
+        motion=np.array(motion),
+    )
+
+
+def load_actions(path: PathLike) -> Tuple[np.ndarray, np.ndarray, MotionType]:
+    """Read a file written by `save_actions`: (starts, actions, motion)."""
+    with np.load(path) as data:
+        return data["starts"], data["actions"], str(data["motion"])
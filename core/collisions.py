@@ -0,0 +1,71 @@
+# mapf_env/core/collisions.py
+
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import numpy as np
+
+
+def swap_pairs(src: np.ndarray, dst: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find all swaps among moves src[k] -> dst[k] (non-negative integer cell keys).
+
+    Returns index arrays (i, j) with i < j, src[i] == dst[j] and
+    src[j] == dst[i], ordered by (i, j). Each move is encoded as one int64
+    key and matched against the key of its reverse by sorting, so the cost
+    is O(N log N) plus the number of pairs reported.
+    """
+    src = np.asarray(src, dtype=np.int64).reshape(-1)
+    dst = np.asarray(dst, dtype=np.int64).reshape(-1)
+    n = src.shape[0]
+    if n < 2:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+
+    base = int(max(src.max(), dst.max())) + 1
+    fwd = src * base + dst
+    rev = dst * base + src
+
+    # stable sort keeps equal keys in agent order, so matches come out sorted
+    order = np.argsort(fwd, kind="stable")
+    fwd_sorted = fwd[order]
+    lo = np.searchsorted(fwd_sorted, rev, side="left")
+    hi = np.searchsorted(fwd_sorted, rev, side="right")
+    counts = hi - lo
+
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+
+    i = np.repeat(np.arange(n, dtype=np.int64), counts)
+    starts = np.cumsum(counts) - counts
+    offsets = np.arange(total, dtype=np.int64) - np.repeat(starts, counts)
+    j = order[np.repeat(lo, counts) + offsets]
+
+    keep = i < j
+    return i[keep], j[keep]
+
+
+def crowded_groups(keys: np.ndarray) -> List[np.ndarray]:
+    """
+    Group indices k by equal keys[k] and return the groups with >= 2 members.
+
+    Each group is an ascending index array; groups are ordered by their
+    lowest index, i.e. the order in which a dict keyed by cell would have
+    first seen them.
+    """
+    keys = np.asarray(keys).reshape(-1)
+    if keys.shape[0] < 2:
+        return []
+
+    order = np.argsort(keys, kind="stable")
+    bounds = np.flatnonzero(np.diff(keys[order])) + 1
+    starts = np.concatenate([[0], bounds])
+    ends = np.concatenate([bounds, [keys.shape[0]]])
+    crowded = (ends - starts) > 1
+
+    groups = [order[s:e] for s, e in zip(starts[crowded], ends[crowded])]
+    groups.sort(key=lambda g: g[0])
+    return groups
@@ -3,34 +3,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List, Literal, Optional, Tuple
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
 
+from .action_mask import illegal_moves, step_mask
+from .actions import MotionType, delta_table
+from .collisions import crowded_groups, swap_pairs
+from .flat import from_flat, in_bounds, to_flat
+from .grid import GridLike
 from .instance import MAPFInstance
-
-MotionType = Literal["4", "8"]
-
-
-def _allowed_deltas(motion: MotionType):
-    """Return a dict: action_id -> (dr, dc)."""
-    four = {
-        0: (0, 0),   # WAIT
-        1: (0, 1),   # RIGHT
-        2: (1, 0),   # DOWN
-        3: (-1, 0),  # UP
-        4: (0, -1),  # LEFT
-    }
-    if motion == "4":
-        return four
-
-    diag = {
-        5: (1, 1),
-        6: (1, -1),
-        7: (-1, 1),
-        8: (-1, -1),
-    }
-    return {**four, **diag}
+from .recorder import TrajectoryRecorder
 
 
 @dataclass
@@ -39,25 +23,73 @@ class MAPFState:
     t: int
     pos: np.ndarray
     goals: np.ndarray
-    grid: np.ndarray
+    grid: GridLike
+
+
+@dataclass(frozen=True)
+class EnvSnapshot:
+    """Opaque token from MAPFEnv.snapshot(); only valid for the same episode."""
+
+    instance: MAPFInstance
+    episode: int                  # MAPFEnv reset count when the snapshot was taken
+    t: int
+    flat_pos: np.ndarray          # (N,) int32 row * W + col
+    trajectory_length: Optional[int]
 
 
 class MAPFEnv:
 
-    def __init__(self, instance: MAPFInstance, motion: MotionType = "4"):
+    def __init__(
+        self,
+        instance: MAPFInstance,
+        motion: MotionType = "4",
+        zero_copy: bool = False,
+        record: bool = False,
+        record_path: Optional[Union[str, Path]] = None,
+    ):
+        """
+        If `zero_copy` is True, the MAPFState objects returned by reset/step/
+        get_state hold read-only views instead of copies: `goals` is shared
+        for the whole episode and `pos` points into one of two preallocated
+        position buffers that `step` alternates between. A state's `pos` is
+        therefore only valid until the second `step` after it was returned;
+        copy it if you need to keep it longer.
+
+        If `record` is True (or `record_path` is given), every position row
+        from reset onwards is appended to a TrajectoryRecorder; `trajectory`
+        returns the recorded (T, N, 2) paths. `record_path` backs the buffer
+        with an on-disk memmap.
+        """
         if motion not in ("4", "8"):
             raise ValueError(f"motion must be '4' or '8', got {motion}")
 
         self.instance = instance
         self.motion: MotionType = motion
-        self._deltas = _allowed_deltas(motion)
+        self._delta_table = delta_table(motion)
 
         self.grid = instance.grid
+        self._action_mask = step_mask(self.grid, motion)
         self.goals = instance.goals
         self.num_agents = instance.num_agents
 
+        self.zero_copy = zero_copy
+
         self.t = 0
+        self.episode = 0  # incremented by reset(); ties snapshots to an episode
         self.pos = None  # will be set in reset()
+        self.flat_pos = None  # (N,) int32 row * W + col, kept in sync with pos
+
+        # zero-copy mode: double-buffered positions + read-only goals view
+        self._pos_buffers: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._goals_view: Optional[np.ndarray] = None
+
+        # (H, W) agent count per cell, updated by step() for moved agents only
+        self.occupancy: Optional[np.ndarray] = None
+        self._crowded_cells = np.zeros(0, dtype=np.int64)  # flat cells with count > 1
+
+        self.recorder: Optional[TrajectoryRecorder] = None
+        if record or record_path is not None:
+            self.recorder = TrajectoryRecorder(self.num_agents, path=record_path)
 
     # ---------------------------------------------------------------
     # Core API
@@ -71,19 +103,34 @@ class MAPFEnv:
         if instance is not None:
             self.instance = instance
             self.grid = instance.grid
+            self._action_mask = step_mask(self.grid, self.motion)
             self.goals = instance.goals
             self.num_agents = instance.num_agents
 
+        self.episode += 1
         self.t = 0
-        # Copy to avoid aliasing with instance.starts
-        self.pos = self.instance.starts.astype(int).copy()
-
-        return MAPFState(
-            t=self.t,
-            pos=self.pos.copy(),
-            goals=self.goals.copy(),
-            grid=self.grid,
-        )
+        if self.zero_copy:
+            N = self.num_agents
+            if self._pos_buffers is None or self._pos_buffers[0].shape[0] != N:
+                self._pos_buffers = (np.empty((N, 2), dtype=int), np.empty((N, 2), dtype=int))
+            self.pos = self._pos_buffers[0]
+            self.pos[:] = self.instance.starts
+            self._goals_view = self.goals.view()
+            self._goals_view.flags.writeable = False
+        else:
+            # Copy to avoid aliasing with instance.starts
+            self.pos = self.instance.starts.astype(int).copy()
+
+        if not np.all(in_bounds(self.pos, self.grid.shape)):
+            H, W = self.grid.shape
+            raise ValueError(f"start positions must lie inside the {H}x{W} grid")
+        self.flat_pos = to_flat(self.pos, self.grid.shape[1])
+        self._reset_occupancy()
+        if self.recorder is not None:
+            self.recorder.reset(self.num_agents)
+            self.recorder.append(self.pos)
+
+        return self.get_state()
 
     def step(self, joint_action: np.ndarray) -> Tuple[MAPFState, Dict]:
 
@@ -93,57 +140,43 @@ class MAPFEnv:
                 f"Expected {self.num_agents} actions, got {actions.shape[0]}"
             )
 
-        prev_pos = self.pos.copy()
-        new_pos = prev_pos.copy()
+        # self.pos is never written in place, so no defensive copy is needed
+        prev_pos = self.pos
+        if self.zero_copy:
+            front, spare = self._pos_buffers
+            back = spare if prev_pos is front else front
+        else:
+            back = np.empty_like(prev_pos)
 
         H, W = self.grid.shape
 
-        invalid_moves: List[int] = []
-        unknown_actions: List[int] = []
-
-        # --- apply moves with "invalid → stay" semantics ---
-        for i in range(self.num_agents):
-            a = int(actions[i])
-
-            if a not in self._deltas:
-                # Treat unknown action as WAIT
-                unknown_actions.append(i)
-                dr, dc = 0, 0
-            else:
-                dr, dc = self._deltas[a]
-
-            r, c = int(prev_pos[i, 0]), int(prev_pos[i, 1])
-            r_new = r + dr
-            c_new = c + dc
-
-            # Check bounds + obstacles
-            if (
-                r_new < 0
-                or r_new >= H
-                or c_new < 0
-                or c_new >= W
-                or self.grid[r_new, c_new] == 1
-            ):
-                # invalid move → stay
-                invalid_moves.append(i)
-                r_new, c_new = r, c
-
-            new_pos[i, 0] = r_new
-            new_pos[i, 1] = c_new
+        # --- action ids -> deltas (unknown ids are treated as WAIT) ---
+        ids = actions.astype(np.int64)
+        unknown = (ids < 0) | (ids >= len(self._delta_table))
+        ids[unknown] = 0
+        new_pos = np.add(prev_pos, self._delta_table[ids], out=back)
+
+        # --- bounds + obstacles via the mask (or packed bits), "invalid -> stay" ---
+        prev_flat = self.flat_pos
+        invalid = illegal_moves(self.grid, self._action_mask, prev_flat, new_pos, ids)
+        new_pos[invalid] = prev_pos[invalid]
+        new_flat = to_flat(new_pos, W)
+
+        invalid_moves: List[int] = np.flatnonzero(invalid).tolist()
+        unknown_actions: List[int] = np.flatnonzero(unknown).tolist()
 
         self.pos = new_pos
+        self.flat_pos = new_flat
         self.t += 1
+        self._update_occupancy(prev_flat, new_flat)
+        if self.recorder is not None:
+            self.recorder.append(new_pos)
 
         # --- compute collisions for this step ---
-        vertex_collisions = self._compute_vertex_collisions(new_pos)
-        edge_collisions = self._compute_edge_collisions(prev_pos, new_pos)
+        vertex_collisions = self._compute_vertex_collisions(new_flat)
+        edge_collisions = self._compute_edge_collisions(prev_flat, new_flat)
 
-        state = MAPFState(
-            t=self.t,
-            pos=self.pos.copy(),
-            goals=self.goals.copy(),
-            grid=self.grid,
-        )
+        state = self.get_state()
 
         info = {
             "t": self.t,
@@ -158,52 +191,136 @@ class MAPFEnv:
     # ---------------------------------------------------------------
     # Collision helpers
     # ---------------------------------------------------------------
+    def _reset_occupancy(self) -> None:
+        H, W = self.grid.shape
+        counts = np.bincount(self.flat_pos, minlength=H * W)
+        if self.occupancy is None or self.occupancy.shape != (H, W):
+            self.occupancy = np.empty((H, W), dtype=np.int32)
+        self.occupancy.reshape(-1)[:] = counts
+        self._crowded_cells = np.flatnonzero(counts > 1)
+
+    def _update_occupancy(self, prev_flat: np.ndarray, curr_flat: np.ndarray) -> None:
+        """Move the counts of agents that changed cell; refresh crowded cells."""
+        moved = prev_flat != curr_flat
+        if not np.any(moved):
+            return
+
+        occ = self.occupancy.reshape(-1)
+        dst = curr_flat[moved]
+        np.subtract.at(occ, prev_flat[moved], 1)
+        np.add.at(occ, dst, 1)
+
+        # a cell can only become crowded by receiving an agent
+        touched = np.unique(np.concatenate([self._crowded_cells, dst]))
+        self._crowded_cells = touched[occ[touched] > 1]
+
     def _compute_vertex_collisions(
-        self, pos: np.ndarray
+        self, flat: np.ndarray
     ) -> List[Tuple[Tuple[int, int], Tuple[int, ...]]]:
-        cell_to_agents: Dict[Tuple[int, int], List[int]] = {}
-        for i in range(self.num_agents):
-            cell = (int(pos[i, 0]), int(pos[i, 1]))
-            cell_to_agents.setdefault(cell, []).append(i)
+        if len(self._crowded_cells) == 0:
+            return []
+
+        W = self.grid.shape[1]
+        agents = np.flatnonzero(np.isin(flat, self._crowded_cells))
 
         collisions = []
-        for cell, agents in cell_to_agents.items():
-            if len(agents) > 1:
-                collisions.append((cell, tuple(agents)))
+        for group in crowded_groups(flat[agents]):
+            members = agents[group]
+            r, c = divmod(int(flat[members[0]]), W)
+            collisions.append(((r, c), tuple(members.tolist())))
         return collisions
 
     def _compute_edge_collisions(
-        self, prev_pos: np.ndarray, curr_pos: np.ndarray
+        self, prev_flat: np.ndarray, curr_flat: np.ndarray
     ) -> List[Tuple[Tuple[int, int], Tuple[int, int, int, int, int, int]]]:
+        ii, jj = swap_pairs(prev_flat, curr_flat)
+        if len(ii) == 0:
+            return []
+
+        W = self.grid.shape[1]
+        from_i = from_flat(prev_flat[ii], W).tolist()
+        to_i = from_flat(curr_flat[ii], W).tolist()
+        from_j = from_flat(prev_flat[jj], W).tolist()
+
         collisions = []
-        N = self.num_agents
-        for i in range(N):
-            for j in range(i + 1, N):
-                if (
-                    prev_pos[i, 0] == curr_pos[j, 0]
-                    and prev_pos[i, 1] == curr_pos[j, 1]
-                    and prev_pos[j, 0] == curr_pos[i, 0]
-                    and prev_pos[j, 1] == curr_pos[i, 1]
-                ):
-                    collisions.append(
-                        (
-                            (i, j),
-                            (
-                                int(prev_pos[i, 0]),
-                                int(prev_pos[i, 1]),
-                                int(curr_pos[i, 0]),
-                                int(curr_pos[i, 1]),
-                                int(prev_pos[j, 0]),
-                                int(prev_pos[j, 1]),
-                            ),
-                        )
-                    )
+        for k, (i, j) in enumerate(zip(ii.tolist(), jj.tolist())):
+            collisions.append(((i, j), (*from_i[k], *to_i[k], *from_j[k])))
         return collisions
 
+    # ---------------------------------------------------------------
+    # Snapshot / restore (tree search)
+    # ---------------------------------------------------------------
+    def snapshot(self) -> EnvSnapshot:
+        """
+        Capture the mutable episode state: `t`, the agents' flat cells and the
+        recorded trajectory length. Costs one (N,) int32 copy.
+        """
+        return EnvSnapshot(
+            instance=self.instance,
+            episode=self.episode,
+            t=self.t,
+            flat_pos=self.flat_pos.copy(),
+            trajectory_length=None if self.recorder is None else len(self.recorder),
+        )
+
+    def restore(self, token: EnvSnapshot) -> MAPFState:
+        """
+        Return to a snapshot taken earlier in the current episode.
+
+        Occupancy counts are patched for the agents whose cell differs, and
+        the trajectory recorder is truncated back to the snapshot's length.
+        """
+        if (
+            token.instance is not self.instance
+            or token.episode != self.episode
+            or token.flat_pos.shape != (self.num_agents,)
+        ):
+            raise ValueError("snapshot does not belong to the current episode")
+        if self.recorder is not None and token.trajectory_length is not None:
+            if token.trajectory_length > len(self.recorder):
+                raise ValueError(
+                    f"snapshot trajectory length {token.trajectory_length} exceeds "
+                    f"the {len(self.recorder)} recorded rows"
+                )
+
+        W = self.grid.shape[1]
+        prev_flat = self.flat_pos
+        if self.zero_copy:
+            # write into the spare buffer so earlier states stay untouched
+            front, spare = self._pos_buffers
+            self.pos = spare if self.pos is front else front
+            self.pos[:] = from_flat(token.flat_pos, W)
+        else:
+            self.pos = from_flat(token.flat_pos, W).astype(int)
+        self.flat_pos = token.flat_pos.copy()
+        self.t = token.t
+        self._update_occupancy(prev_flat, self.flat_pos)
+
+        if self.recorder is not None and token.trajectory_length is not None:
+            self.recorder.truncate(token.trajectory_length)
+
+        return self.get_state()
+
     # ---------------------------------------------------------------
     # Convenience: current state + simple render hook
     # ---------------------------------------------------------------
+    @property
+    def trajectory(self) -> Optional[np.ndarray]:
+        """Recorded (T, N, 2) paths since the last reset, or None if not recording."""
+        if self.recorder is None:
+            return None
+        return self.recorder.paths
+
     def get_state(self) -> MAPFState:
+        if self.zero_copy:
+            pos_view = self.pos.view()
+            pos_view.flags.writeable = False
+            return MAPFState(
+                t=self.t,
+                pos=pos_view,
+                goals=self._goals_view,
+                grid=self.grid,
+            )
         return MAPFState(
             t=self.t,
             pos=self.pos.copy(),
@@ -0,0 +1,54 @@
+# mapf_env/core/flat.py
+
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def to_flat(pos: np.ndarray, width: int) -> np.ndarray:
+    """
+    (..., 2) array of (row, col) -> (...) int32 array of `row * width + col`.
+
+    Positions are assumed to be inside the grid; use `position_keys` when
+    out-of-bounds positions must stay distinguishable.
+    """
+    pos = np.asarray(pos)
+    return (pos[..., 0] * width + pos[..., 1]).astype(np.int32, copy=False)
+
+
+def from_flat(flat: np.ndarray, width: int) -> np.ndarray:
+    """(...) array of flat cell indices -> (..., 2) int32 array of (row, col)."""
+    rows, cols = np.divmod(np.asarray(flat), width)
+    return np.stack([rows, cols], axis=-1).astype(np.int32, copy=False)
+
+
+def in_bounds(pos: np.ndarray, shape: Tuple[int, int]) -> np.ndarray:
+    """(..., 2) array of (row, col) -> (...) bool mask of cells inside `shape`."""
+    pos = np.asarray(pos)
+    H, W = shape
+    rows = pos[..., 0]
+    cols = pos[..., 1]
+    return (rows >= 0) & (rows < H) & (cols >= 0) & (cols < W)
+
+
+def position_keys(pos: np.ndarray, shape: Optional[Tuple[int, int]] = None) -> np.ndarray:
+    """
+    (..., 2) array of (row, col) -> (...) int64 keys, equal iff positions are equal.
+
+    If `shape` is given and every position is inside it, the keys are the
+    flat cell indices. Otherwise the positions are encoded relative to their
+    own bounding box, so out-of-bounds positions never alias real cells.
+    """
+    pos = np.asarray(pos).astype(np.int64, copy=False)
+    if pos.size == 0:
+        return np.zeros(pos.shape[:-1], dtype=np.int64)
+    if shape is not None and np.all(in_bounds(pos, shape)):
+        return pos[..., 0] * shape[1] + pos[..., 1]
+
+    rows = pos[..., 0]
+    cols = pos[..., 1]
+    c_min = cols.min()
+    span = int(cols.max() - c_min) + 1
+    return (rows - rows.min()) * span + (cols - c_min)
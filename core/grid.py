@@ -0,0 +1,133 @@
+# mapf_env/core/grid.py
+
+from __future__ import annotations
+
+from multiprocessing import shared_memory
+from typing import Tuple, Union
+
+import numpy as np
+from numpy.lib.mixins import NDArrayOperatorsMixin
+
+from .shared import SharedSpec, attach_array, share_array
+
+
+class PackedGrid(NDArrayOperatorsMixin):
+    """
+    Occupancy grid stored one bit per cell (`np.packbits`, row-major,
+    little bit order): 8x smaller than the int8 grids from `load_map`.
+
+    Point lookups (`is_blocked`, `grid[rows, cols]` with integer indices)
+    read the bits directly. Anything else that needs the dense array —
+    `np.asarray(grid)`, ufuncs and operators such as `grid == 0`, slicing —
+    gets a freshly unpacked (H, W) int8 copy, which is not kept around.
+    """
+
+    def __init__(self, bits: np.ndarray, shape: Tuple[int, int]):
+        H, W = (int(n) for n in shape)
+        bits = np.asarray(bits)
+        if bits.dtype != np.uint8 or bits.shape != ((H * W + 7) // 8,):
+            raise ValueError(
+                f"bits must be a ({(H * W + 7) // 8},) uint8 array for a {H}x{W} "
+                f"grid; got {bits.shape} {bits.dtype}"
+            )
+        self.bits = bits
+        self.shape = (H, W)
+
+    @classmethod
+    def from_dense(cls, grid: np.ndarray) -> "PackedGrid":
+        """Pack a dense grid (non-zero = blocked)."""
+        grid = np.asarray(grid)
+        if grid.ndim != 2:
+            raise ValueError(f"grid must be 2D, got shape {grid.shape}")
+        bits = np.packbits(grid.reshape(-1) != 0, bitorder="little")
+        return cls(bits, grid.shape)
+
+    @property
+    def ndim(self) -> int:
+        return 2
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __repr__(self) -> str:
+        H, W = self.shape
+        return f"PackedGrid({H}x{W}, {self.nbytes} bytes)"
+
+    def unpack(self) -> np.ndarray:
+        """New dense (H, W) int8 grid, 1 = blocked."""
+        H, W = self.shape
+        cells = np.unpackbits(self.bits, count=H * W, bitorder="little")
+        return cells.view(np.int8).reshape(H, W)
+
+    def is_blocked_flat(self, flat: np.ndarray) -> np.ndarray:
+        """Bool array: cells at in-range flat indices `row * W + col` are blocked."""
+        flat = np.asarray(flat, dtype=np.int64)
+        return ((self.bits[flat >> 3] >> (flat & 7)) & 1).astype(bool)
+
+    def is_blocked(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """
+        Bool array (broadcast shape of `rows`, `cols`): the cell is blocked.
+        Cells outside the grid read as blocked.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        H, W = self.shape
+        inside = (rows >= 0) & (rows < H) & (cols >= 0) & (cols < W)
+        flat = np.where(inside, rows * W + cols, 0)
+        return ~inside | self.is_blocked_flat(flat)
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple) and len(key) == 2:
+            rows, cols = np.asarray(key[0]), np.asarray(key[1])
+            if rows.dtype.kind in "iu" and cols.dtype.kind in "iu":
+                H, W = self.shape
+                if np.any((rows < -H) | (rows >= H) | (cols < -W) | (cols >= W)):
+                    raise IndexError(f"index out of bounds for a {H}x{W} grid")
+                rows = np.where(rows < 0, rows + H, rows)
+                cols = np.where(cols < 0, cols + W, cols)
+                values = self.is_blocked_flat(rows * W + cols).astype(np.int8)
+                return values[()]  # 0-d -> scalar, like ndarray indexing
+        return self.unpack()[key]
+
+    def __array__(self, dtype=None, copy=None):
+        if copy is False:
+            raise ValueError("a PackedGrid cannot be viewed as a dense array without a copy")
+        dense = self.unpack()
+        return dense if dtype is None else dense.astype(dtype, copy=False)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if any(isinstance(x, PackedGrid) for x in kwargs.get("out", ())):
+            return NotImplemented
+        inputs = tuple(x.unpack() if isinstance(x, PackedGrid) else x for x in inputs)
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+
+GridLike = Union[np.ndarray, PackedGrid]
+
+
+def blocked_cells(grid: GridLike, flat: np.ndarray) -> np.ndarray:
+    """Bool array: the cells at in-range flat indices `flat` of `grid` are blocked."""
+    if isinstance(grid, PackedGrid):
+        return grid.is_blocked_flat(flat)
+    return np.ravel(grid)[flat] == 1
+
+
+def share_grid(grid: GridLike) -> Tuple[shared_memory.SharedMemory, SharedSpec]:
+    """`share_array` for a dense or packed grid; packed grids stay packed."""
+    if isinstance(grid, PackedGrid):
+        shm, spec = share_array(grid.bits)
+        spec["grid_shape"] = grid.shape
+        return shm, spec
+    return share_array(grid)
+
+
+def attach_grid(spec: SharedSpec) -> Tuple[shared_memory.SharedMemory, GridLike]:
+    """`attach_array` for a block created by `share_grid`."""
+    shm, arr = attach_array(spec)
+    if "grid_shape" in spec:
+        return shm, PackedGrid(arr, spec["grid_shape"])
+    return shm, arr
@@ -7,10 +7,12 @@ from typing import Any, Tuple
 
 import numpy as np
 
+from .grid import GridLike
+
 
 @dataclass
 class MAPFInstance:
-    grid: np.ndarray
+    grid: GridLike  # dense (H, W) int8 or PackedGrid
     starts: np.ndarray
     goals: np.ndarray
     num_agents: int
@@ -74,7 +76,7 @@ class MAPFInstance:
 
 
 def instance_from_scen(
-    grid: np.ndarray,
+    grid: GridLike,
     scen_starts: np.ndarray,
     scen_goals: np.ndarray,
     k: int,
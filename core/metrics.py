@@ -0,0 +1,136 @@
+# mapf_env/core/metrics.py
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .actions import ACTION_DELTAS
+
+
+def _chunk_step(chunk_size: Optional[int], T: int) -> int:
+    step = max(T, 1) if chunk_size is None else int(chunk_size)
+    if step < 1:
+        raise ValueError(f"chunk_size must be >= 1, got {chunk_size}")
+    return step
+
+
+def arrival_times(
+    paths: np.ndarray, goals: np.ndarray, chunk_size: Optional[int] = None
+) -> np.ndarray:
+    """
+    (N,) int64 arrival time of each agent: the first t from which it sits on
+    its goal until the end of `paths`, or -1 if it is not at its goal at the
+    last timestep.
+
+    Time is scanned backwards in windows of `chunk_size` rows (default: all
+    at once). Per window, a reverse cumulative AND over the "at goal" mask
+    extends each agent's at-goal suffix; the scan stops as soon as no agent
+    is still on its goal, so a memory-mapped `paths` is read only as far
+    back as needed.
+    """
+    paths = np.asarray(paths)  # a view for memmaps; nothing is read yet
+    if paths.ndim != 3 or paths.shape[2] != 2:
+        raise ValueError(f"paths must have shape (T, N, 2); got {paths.shape}")
+    goals = np.asarray(goals)
+    if goals.shape != (paths.shape[1], 2):
+        raise ValueError(
+            f"goals must have shape (N, 2); got {goals.shape}, N={paths.shape[1]}"
+        )
+
+    T = paths.shape[0]
+    step = _chunk_step(chunk_size, T)
+    suffix = np.zeros(paths.shape[1], dtype=np.int64)
+    settled = np.ones(paths.shape[1], dtype=bool)  # at goal from `stop` onwards
+    stop = T
+    while stop > 0 and settled.any():
+        start = max(stop - step, 0)
+        at_goal = np.all(np.asarray(paths[start:stop]) == goals, axis=2)  # (w, N)
+        stays = np.logical_and.accumulate(at_goal[::-1], axis=0) & settled
+        suffix += stays.sum(axis=0)
+        settled = stays[-1]
+        stop = start
+    return np.where(suffix > 0, T - suffix, -1).astype(np.int64)
+
+
+def action_arrival_times(
+    starts: np.ndarray,
+    actions: np.ndarray,
+    goals: np.ndarray,
+    chunk_size: Optional[int] = None,
+) -> np.ndarray:
+    """
+    `arrival_times` of an action-encoded path (see `core.actions`) without
+    decoding it: the final cell is the start plus the summed action deltas,
+    and an agent that ends on its goal arrived right before its trailing run
+    of WAITs (every other action moves). Both passes read `actions` in
+    windows of `chunk_size` rows.
+    """
+    starts = np.asarray(starts)
+    actions = np.asarray(actions)
+    goals = np.asarray(goals)
+    if actions.ndim != 2 or starts.shape != (actions.shape[1], 2):
+        raise ValueError(
+            f"expected starts (N, 2) and actions (T-1, N); "
+            f"got {starts.shape} and {actions.shape}"
+        )
+    if goals.shape != starts.shape:
+        raise ValueError(f"goals must have shape {starts.shape}; got {goals.shape}")
+
+    num_steps, N = actions.shape
+    step = _chunk_step(chunk_size, num_steps)
+    final = starts.astype(np.int64)
+    for start in range(0, num_steps, step):
+        window = np.asarray(actions[start : start + step])
+        if window.size and int(window.max()) >= len(ACTION_DELTAS):
+            raise ValueError(f"unknown action id {int(window.max())}")
+        final += ACTION_DELTAS[window].sum(axis=0)
+    at_goal = np.all(final == goals, axis=1)
+
+    waits = np.zeros(N, dtype=np.int64)
+    settled = at_goal.copy()  # waited from `stop` onwards
+    stop = num_steps
+    while stop > 0 and settled.any():
+        start = max(stop - step, 0)
+        is_wait = np.asarray(actions[start:stop]) == 0
+        run = np.logical_and.accumulate(is_wait[::-1], axis=0) & settled
+        waits += run.sum(axis=0)
+        settled = run[-1]
+        stop = start
+    return np.where(at_goal, num_steps - waits, -1).astype(np.int64)
+
+
+def _cost_metrics(arrival: np.ndarray) -> Dict[str, Any]:
+    arrived = arrival >= 0
+    all_arrived = bool(np.all(arrived))
+
+    return {
+        "arrival_times": arrival,
+        "num_arrived": int(np.count_nonzero(arrived)),
+        "sum_of_costs": int(arrival.sum()) if all_arrived else None,
+        "makespan": int(arrival.max(initial=0)) if all_arrived else None,
+    }
+
+
+def solution_metrics(
+    paths: np.ndarray, goals: np.ndarray, chunk_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Standard MAPF cost metrics of a solution.
+
+    Returns a dict with per-agent `arrival_times` (see `arrival_times`),
+    `num_arrived`, `sum_of_costs` (sum of arrival times) and `makespan`
+    (latest arrival time). The last two are None unless every agent arrives.
+    """
+    return _cost_metrics(arrival_times(paths, goals, chunk_size))
+
+
+def action_solution_metrics(
+    starts: np.ndarray,
+    actions: np.ndarray,
+    goals: np.ndarray,
+    chunk_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """`solution_metrics` of an action-encoded path, via `action_arrival_times`."""
+    return _cost_metrics(action_arrival_times(starts, actions, goals, chunk_size))
@@ -0,0 +1,138 @@
+# mapf_env/core/recorder.py
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+PathLike = Union[str, Path]
+
+
+class TrajectoryRecorder:
+    """
+    Append-only (T, N, 2) position buffer in the canonical path format.
+
+    Rows are written into a preallocated buffer whose capacity doubles when
+    full, so recording costs amortized O(N) per step. If `path` is given the
+    buffer is a memmapped .npy file and grows by extending the file, so long
+    episodes do not need to fit in RAM. `flush()` rewrites the header to the
+    recorded length, after which `np.load(path)` (with or without
+    `mmap_mode`) returns exactly the rows recorded so far; `close()` also
+    trims the unused capacity off the end of the file.
+
+    `paths` is a (T, N, 2) view of the rows recorded so far and can be passed
+    straight to `validate_paths` or `animate_paths`.
+    """
+
+    def __init__(
+        self,
+        num_agents: int,
+        capacity: int = 256,
+        dtype=np.int32,
+        path: Optional[PathLike] = None,
+    ):
+        if capacity < 1:
+            raise ValueError(f"capacity must be >= 1, got {capacity}")
+
+        self.num_agents = int(num_agents)
+        self.dtype = np.dtype(dtype)
+        self.path = None if path is None else Path(path)
+        self.length = 0
+        self._buf = self._allocate(int(capacity))
+
+    # ---------------------------------------------------------------
+    # Core API
+    # ---------------------------------------------------------------
+    @property
+    def capacity(self) -> int:
+        return self._buf.shape[0]
+
+    @property
+    def paths(self) -> np.ndarray:
+        return self._buf[: self.length]
+
+    def __len__(self) -> int:
+        return self.length
+
+    def reset(self, num_agents: Optional[int] = None) -> None:
+        """Drop recorded rows; reallocate only if the agent count changes."""
+        self.length = 0
+        if num_agents is not None and int(num_agents) != self.num_agents:
+            self.num_agents = int(num_agents)
+            self._buf = self._allocate(self.capacity)
+
+    def append(self, pos: np.ndarray) -> None:
+        """Record one (N, 2) row of positions."""
+        if self.length == self.capacity:
+            self._grow(2 * self.capacity)
+        self._buf[self.length] = pos
+        self.length += 1
+
+    def truncate(self, length: int) -> None:
+        """Forget rows at index >= `length` (the buffer keeps its capacity)."""
+        if not 0 <= length <= self.length:
+            raise ValueError(f"length must be in [0, {self.length}], got {length}")
+        self.length = int(length)
+
+    def flush(self) -> None:
+        """Write buffered rows to disk and set the .npy header to `length` rows."""
+        if self.path is None:
+            return
+        self._buf.flush()
+        self._write_header(self.length)
+
+    def close(self) -> None:
+        """
+        `flush()`, then cut the file down to `length` rows and unmap it.
+        The recorder cannot be used afterwards.
+        """
+        if self.path is None or self._buf is None:
+            return
+        self.flush()
+        offset = self._buf.offset
+        del self._buf
+        with self.path.open("r+b") as f:
+            f.truncate(offset + self.length * self._row_bytes)
+        self._buf = None
+
+    # ---------------------------------------------------------------
+    # Buffer management
+    # ---------------------------------------------------------------
+    def _allocate(self, capacity: int) -> np.ndarray:
+        shape = (capacity, self.num_agents, 2)
+        if self.path is None:
+            return np.empty(shape, dtype=self.dtype)
+        return np.lib.format.open_memmap(self.path, mode="w+", dtype=self.dtype, shape=shape)
+
+    @property
+    def _row_bytes(self) -> int:
+        return self.num_agents * 2 * self.dtype.itemsize
+
+    def _write_header(self, rows: int) -> None:
+        header = {
+            "descr": np.lib.format.dtype_to_descr(self.dtype),
+            "fortran_order": False,
+            "shape": (rows, self.num_agents, 2),
+        }
+        with self.path.open("r+b") as f:
+            np.lib.format.write_array_header_1_0(f, header)
+            # headers are padded so axis 0 can grow without moving the data
+            assert f.tell() == self._buf.offset
+
+    def _grow(self, capacity: int) -> None:
+        if self.path is None:
+            buf = np.empty((capacity, self.num_agents, 2), dtype=self.dtype)
+            buf[: self.length] = self._buf[: self.length]
+            self._buf = buf
+            return
+
+        # rows are contiguous in C order, so growing T just extends the file
+        self._buf.flush()
+        self._write_header(capacity)
+        offset = self._buf.offset
+        del self._buf
+        with self.path.open("r+b") as f:
+            f.truncate(offset + capacity * self._row_bytes)
+        self._buf = np.lib.format.open_memmap(self.path, mode="r+")
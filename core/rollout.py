@@ -0,0 +1,167 @@
+# mapf_env/core/rollout.py
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from .action_mask import set_legal_action_mask, step_mask
+from .env import MAPFEnv, MAPFState, MotionType
+from .grid import GridLike, attach_grid, share_grid
+from .instance import MAPFInstance
+from .shared import SharedSpec, attach_array, share_array
+
+# policy(state, rng, motion) -> (N,) joint action; must be picklable (top-level)
+Policy = Callable[[MAPFState, np.random.Generator, MotionType], np.ndarray]
+
+
+def random_policy(
+    state: MAPFState, rng: np.random.Generator, motion: MotionType
+) -> np.ndarray:
+    """Uniformly random action id per agent (WAIT included)."""
+    num_actions = 9 if motion == "8" else 5
+    return rng.integers(0, num_actions, size=state.pos.shape[0])
+
+
+@dataclass
+class RolloutResult:
+    index: int                  # position of the instance in the input list
+    paths: np.ndarray           # (steps + 1, N, 2), int16 when the grid allows
+    num_vertex_collisions: int  # colliding agent pairs, summed over steps
+    num_edge_collisions: int    # swapping agent pairs, summed over steps
+    num_invalid_moves: int      # moves into walls / off-grid, summed over steps
+
+
+# ---------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------
+_worker_grid: Optional[GridLike] = None
+_worker_shms: List = []  # keeps shared blocks mapped for the worker's lifetime
+
+
+def _init_worker(
+    grid_spec: SharedSpec, mask_spec: Optional[SharedSpec], motion: MotionType
+) -> None:
+    global _worker_grid
+    shm, _worker_grid = attach_grid(grid_spec)
+    _worker_shms.append(shm)
+    if mask_spec is not None:
+        # every env in this worker reuses the driver's legal-action mask
+        shm, mask = attach_array(mask_spec)
+        _worker_shms.append(shm)
+        set_legal_action_mask(_worker_grid, motion, mask)
+
+
+def _rollout(
+    grid: GridLike,
+    index: int,
+    starts: np.ndarray,
+    goals: np.ndarray,
+    steps: int,
+    motion: MotionType,
+    policy: Policy,
+    seed: int,
+) -> RolloutResult:
+    instance = MAPFInstance(
+        grid=grid, starts=starts, goals=goals, num_agents=starts.shape[0]
+    )
+    env = MAPFEnv(instance, motion=motion, zero_copy=True, record=True)
+    rng = np.random.default_rng(seed)
+
+    state = env.reset()
+    num_vertex = num_edge = num_invalid = 0
+    for _ in range(steps):
+        state, info = env.step(policy(state, rng, motion))
+        for _, agents in info["vertex_collisions"]:
+            k = len(agents)
+            num_vertex += k * (k - 1) // 2
+        num_edge += len(info["edge_collisions"])
+        num_invalid += len(info["invalid_moves"])
+
+    paths = env.trajectory
+    if max(grid.shape) <= np.iinfo(np.int16).max:
+        paths = paths.astype(np.int16)
+    else:
+        paths = paths.copy()
+
+    return RolloutResult(
+        index=index,
+        paths=paths,
+        num_vertex_collisions=num_vertex,
+        num_edge_collisions=num_edge,
+        num_invalid_moves=num_invalid,
+    )
+
+
+def _rollout_task(args) -> RolloutResult:
+    return _rollout(_worker_grid, *args)
+
+
+# ---------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------
+def run_rollouts(
+    instances: Sequence[MAPFInstance],
+    steps: int,
+    *,
+    motion: MotionType = "4",
+    policy: Policy = random_policy,
+    num_workers: Optional[int] = None,
+    seed: int = 0,
+    chunksize: int = 1,
+) -> List[RolloutResult]:
+    """
+    Run one `steps`-long MAPFEnv rollout per instance on a process pool.
+
+    All instances must share one grid. It is copied once into shared memory
+    and mapped read-only by every worker, together with its legal-action
+    mask (dense grids only; a PackedGrid is checked against its bits), so
+    workers build no per-cell arrays of their own except each env's
+    occupancy counts. Each task only ships the instance's starts/goals and
+    returns a compact trajectory plus collision counts.
+    Rollout i uses the RNG seed `seed + i`, so results do not depend on the
+    number of workers. With `num_workers=0` everything runs in-process.
+    Results are returned in input order.
+    """
+    if len(instances) == 0:
+        return []
+
+    grid = instances[0].grid
+    for k, inst in enumerate(instances[1:], start=1):
+        if inst.grid is not grid and not np.array_equal(inst.grid, grid):
+            raise ValueError(f"instance {k} does not share the grid of instance 0")
+
+    tasks = [
+        (i, np.asarray(inst.starts), np.asarray(inst.goals), steps, motion, policy, seed + i)
+        for i, inst in enumerate(instances)
+    ]
+
+    if num_workers == 0:
+        return [_rollout(grid, *task) for task in tasks]
+
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+
+    owned = []
+    try:
+        shm, grid_spec = share_grid(grid)
+        owned.append(shm)
+        mask_spec = None
+        mask = step_mask(grid, motion)  # None for a PackedGrid
+        if mask is not None:
+            shm, mask_spec = share_array(mask.reshape(grid.shape))
+            owned.append(shm)
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_worker,
+            initargs=(grid_spec, mask_spec, motion),
+        ) as pool:
+            return list(pool.map(_rollout_task, tasks, chunksize=chunksize))
+    finally:
+        for shm in owned:
+            shm.close()
+            shm.unlink()
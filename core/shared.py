@@ -0,0 +1,41 @@
+# mapf_env/core/shared.py
+
+from __future__ import annotations
+
+from multiprocessing import shared_memory
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+# Picklable description of a shared array: {"name", "shape", "dtype"}
+SharedSpec = Dict[str, Any]
+
+
+def share_array(arr: np.ndarray) -> Tuple[shared_memory.SharedMemory, SharedSpec]:
+    """
+    Copy `arr` once into a new shared-memory block.
+
+    The caller owns the block and must `close()` and `unlink()` it when the
+    workers are done. The returned spec is what workers pass to
+    `attach_array`.
+    """
+    arr = np.ascontiguousarray(arr)
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+    view[...] = arr
+    spec = {"name": shm.name, "shape": arr.shape, "dtype": arr.dtype.str}
+    return shm, spec
+
+
+def attach_array(spec: SharedSpec) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    """
+    Map a block created by `share_array` as a read-only array (no copy).
+
+    Keep the returned SharedMemory object alive as long as the array is used.
+    """
+    # Pool workers share the creator's resource tracker, so attaching here
+    # does not hand ownership (or the unlink at exit) to the worker.
+    shm = shared_memory.SharedMemory(name=spec["name"])
+    arr = np.ndarray(spec["shape"], dtype=np.dtype(spec["dtype"]), buffer=shm.buf)
+    arr.flags.writeable = False
+    return shm, arr
@@ -2,12 +2,37 @@
 
 from __future__ import annotations
 
-from typing import Dict, Optional, Literal, Any, Tuple
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Literal, Any, Tuple, Union
 import numpy as np
 
+from .actions import ACTION_DELTAS, decode_actions, delta_table
+from .collisions import swap_pairs
+from .flat import in_bounds, position_keys, to_flat
+from .grid import GridLike, attach_grid, blocked_cells, share_grid
+from .shared import SharedSpec, attach_array, share_array
+
 
 Connectivity = Literal["4", "8"]
 
+# Check types in first_error priority order, with their result-dict counter
+_CHECKS = (
+    ("bounds", "num_out_of_bounds"),
+    ("obstacle", "num_on_obstacle"),
+    ("illegal_move", "num_illegal_moves"),
+    ("vertex_collision", "num_vertex_collisions"),
+    ("edge_collision", "num_edge_collisions"),
+)
+
+# First window of a fail-fast scan; windows then double up to the chunk size
+_FAIL_FAST_WINDOW = 8
+
+# {check type: (count, earliest error or None)}
+CheckTotals = Dict[str, Tuple[int, Optional[Dict[str, Any]]]]
+
 
 def _allowed_deltas(connectivity: Connectivity):
     """Return a set of allowed (dr, dc) moves."""
@@ -31,144 +56,437 @@ def _allowed_deltas(connectivity: Connectivity):
     return four | diag
 
 
-def validate_paths(
-    grid: np.ndarray,
-    paths: np.ndarray,
-    *,
-    starts: Optional[np.ndarray] = None,
-    goals: Optional[np.ndarray] = None,
-    connectivity: Connectivity = "4",
-) -> Dict[str, Any]:
-    if paths.ndim != 3 or paths.shape[2] != 2:
-        raise ValueError(f"paths must have shape (T, N, 2); got {paths.shape}")
+def _first_positions(
+    paths: np.ndarray, mask: np.ndarray, kind: str
+) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """Count flagged (t, agent) entries; report up to 4 agents at the earliest t."""
+    count = int(np.count_nonzero(mask))
+    if count == 0:
+        return 0, None
+
+    t = int(np.argmax(mask.any(axis=1)))
+    idxs = np.flatnonzero(mask[t])[:4]
+    error = {
+        "time": t,
+        "type": kind,
+        "agents": tuple(int(i) for i in idxs),
+        "extra": {"positions": [tuple(map(int, paths[t, i])) for i in idxs]},
+    }
+    return count, error
+
 
+def _position_masks(grid: GridLike, paths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(T, N) masks of out-of-bounds positions and in-bounds positions on obstacles."""
     H, W = grid.shape
+    oob = ~in_bounds(paths, (H, W))
+    flat = to_flat(np.where(oob[..., None], 0, paths), W)
+    blocked = ~oob & blocked_cells(grid, flat)
+    return oob, blocked
+
+
+def _position_errors(grid: GridLike, paths: np.ndarray) -> CheckTotals:
+    """Out-of-bounds positions and in-bounds positions on obstacles."""
+    oob, blocked = _position_masks(grid, paths)
+    return {
+        "bounds": _first_positions(paths, oob, "bounds"),
+        "obstacle": _first_positions(paths, blocked, "obstacle"),
+    }
+
+
+def _move_deltas(
+    paths: np.ndarray, connectivity: Connectivity
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(T-1, N, 2) step deltas and the (T-1, N) mask of allowed ones."""
+    table = np.zeros((3, 3), dtype=bool)
+    for dr, dc in _allowed_deltas(connectivity):
+        table[dr + 1, dc + 1] = True
+
+    deltas = np.diff(paths.astype(np.int64, copy=False), axis=0)
+    near = np.all(np.abs(deltas) <= 1, axis=2)
+    legal = near & table[
+        np.where(near, deltas[..., 0] + 1, 0), np.where(near, deltas[..., 1] + 1, 0)
+    ]
+    return deltas, legal
+
+
+def _illegal_moves(
+    paths: np.ndarray, connectivity: Connectivity
+) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """
+    Count steps whose (dr, dc) is not an allowed move, over all of `paths`
+    at once, and build the error for the earliest one (lowest agent first).
+    """
     T, N, _ = paths.shape
+    if T < 2 or N == 0:
+        return 0, None
+
+    deltas, legal = _move_deltas(paths, connectivity)
+    bad = np.flatnonzero(~legal.reshape(-1))
+    if len(bad) == 0:
+        return 0, None
+
+    step, i = divmod(int(bad[0]), N)
+    error = {
+        "time": step + 1,
+        "type": "illegal_move",
+        "agents": (i,),
+        "extra": {"delta": (int(deltas[step, i, 0]), int(deltas[step, i, 1]))},
+    }
+    return len(bad), error
+
+
+def _illegal_actions(
+    actions: np.ndarray, connectivity: Connectivity
+) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """
+    Illegal moves of an action-encoded path: only action ids outside the
+    `connectivity` table (diagonals under "4") can be illegal.
+    """
+    bad = np.flatnonzero(np.asarray(actions).reshape(-1) >= len(delta_table(connectivity)))
+    if len(bad) == 0:
+        return 0, None
+
+    N = actions.shape[1]
+    step, i = divmod(int(bad[0]), N)
+    dr, dc = ACTION_DELTAS[actions[step, i]]
+    error = {
+        "time": step + 1,
+        "type": "illegal_move",
+        "agents": (i,),
+        "extra": {"delta": (int(dr), int(dc))},
+    }
+    return len(bad), error
+
+
+def _vertex_groups(
+    paths: np.ndarray, shape: Tuple[int, int]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Group (t, agent) entries of `paths` by equal (t, position).
+
+    Returns the stable sort order of the flattened entries (t * N + agent)
+    and the [start, end) bounds of the groups with >= 2 members in it;
+    inside a group, entries are in ascending agent order.
+    """
+    T = paths.shape[0]
+    keys = position_keys(paths, shape)  # (T, N), out-of-bounds safe
+    span = int(keys.max()) + 1
+    keys = keys + np.arange(T, dtype=np.int64)[:, None] * span
+
+    flat = keys.reshape(-1)
+    order = np.argsort(flat, kind="stable")
+    bounds = np.flatnonzero(np.diff(flat[order])) + 1
+    starts = np.concatenate([[0], bounds])
+    ends = np.concatenate([bounds, [flat.shape[0]]])
+    crowded = (ends - starts) > 1
+    return order, starts[crowded], ends[crowded]
+
+
+def _vertex_collisions(
+    paths: np.ndarray, shape: Tuple[int, int]
+) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """
+    Count agent pairs sharing a position at the same timestep, over all of
+    `paths` at once, and build the earliest vertex-collision error.
+
+    Every entry gets one (t, position) key; a stable sort groups equal keys,
+    and a group of k agents contributes k * (k - 1) / 2 pairs. The reported
+    group is the one at the earliest t with the lowest agent index, which is
+    the group whose first element in (t, agent) order comes first.
+    """
+    T, N, _ = paths.shape
+    if T == 0 or N < 2:
+        return 0, None
+
+    order, starts, ends = _vertex_groups(paths, shape)
+    if len(starts) == 0:
+        return 0, None
+
+    k = ends - starts
+    count = int(np.sum(k * (k - 1) // 2))
+
+    # stable sort: order[start] is the group's lowest (t, agent) entry
+    g = int(np.argmin(order[starts]))
+    members = order[starts[g] : ends[g]]
+    t, agents = np.divmod(members, N)
+    t = int(t[0])
+    error = {
+        "time": t,
+        "type": "vertex_collision",
+        "agents": tuple(int(a) for a in agents),
+        "extra": {"cell": tuple(map(int, paths[t, agents[0]]))},
+    }
+    return count, error
+
+
+def _edge_collisions(
+    paths: np.ndarray, shape: Tuple[int, int]
+) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """
+    Count agent pairs that swap positions between consecutive timesteps,
+    over all of `paths` at once, and build the earliest edge-collision error.
+
+    Each move becomes one directed-edge key (t, from, to). Distinct keys are
+    counted with `np.unique` and matched against their reverse (t, to, from)
+    with `np.searchsorted`: n forward and m reverse moves give n * m swapping
+    pairs, and k agents waiting on the same cell (their own reverse) give
+    k * (k - 1) / 2. Only the earliest offending step is expanded into agent
+    pairs, to report its lowest (i, j).
+    """
+    T, N, _ = paths.shape
+    if T < 2 or N < 2:
+        return 0, None
+
+    # compact position ids keep (t, from, to) keys small
+    _, cells = np.unique(position_keys(paths, shape), return_inverse=True)
+    cells = cells.reshape(T, N).astype(np.int64, copy=False)
+    K = int(cells.max()) + 1
+    src = cells[:-1]
+    dst = cells[1:]
+
+    count = 0
+    first_t: Optional[int] = None
+    # split time so t * K * K stays inside int64
+    block = max(1, (2**62) // (K * K))
+    for t0 in range(0, T - 1, block):
+        s = src[t0 : t0 + block]
+        d = dst[t0 : t0 + block]
+        tt = np.arange(s.shape[0], dtype=np.int64)[:, None]
+
+        keys, counts = np.unique(((tt * K + s) * K + d).reshape(-1), return_counts=True)
+        t_rel, rest = np.divmod(keys, K * K)
+        a, b = np.divmod(rest, K)
+
+        rev = (t_rel * K + b) * K + a
+        idx = np.minimum(np.searchsorted(keys, rev), len(keys) - 1)
+        rev_counts = np.where(keys[idx] == rev, counts[idx], 0)
+
+        pairs = np.where(a == b, counts * (counts - 1) // 2, 0)
+        pairs = np.where(a < b, counts * rev_counts, pairs)
+
+        hit = np.flatnonzero(pairs)
+        if len(hit) == 0:
+            continue
+        count += int(pairs.sum())
+        if first_t is None:
+            first_t = t0 + int(t_rel[hit].min())
+
+    if first_t is None:
+        return 0, None
+
+    ii, jj = swap_pairs(src[first_t], dst[first_t])
+    i, j = int(ii[0]), int(jj[0])
+    prev = paths[first_t]
+    curr = paths[first_t + 1]
+    error = {
+        "time": first_t + 1,
+        "type": "edge_collision",
+        "agents": (i, j),
+        "extra": {
+            "from_to_i": (int(prev[i, 0]), int(prev[i, 1]), int(curr[i, 0]), int(curr[i, 1])),
+            "from_to_j": (int(prev[j, 0]), int(prev[j, 1]), int(curr[j, 0]), int(curr[j, 1])),
+        },
+    }
+    return count, error
+
+
+# ---------------------------------------------------------------
+# Conflict listing
+# ---------------------------------------------------------------
+# Conflict type codes: index into CONFLICT_TYPES (same order as _CHECKS)
+CONFLICT_TYPES = tuple(kind for kind, _ in _CHECKS)
+
+# One record per conflict. (row, col) is where agent_i is at `time` and
+# (prev_row, prev_col) where it was at time - 1 (the same cell at t = 0).
+# agent_j is the other agent of a vertex/edge conflict, -1 otherwise; vertex
+# conflicts are listed once per colliding pair.
+CONFLICT_DTYPE = np.dtype(
+    [
+        ("time", np.int64),
+        ("type", np.uint8),
+        ("agent_i", np.int32),
+        ("agent_j", np.int32),
+        ("row", np.int32),
+        ("col", np.int32),
+        ("prev_row", np.int32),
+        ("prev_col", np.int32),
+    ]
+)
+
+
+def _swap_steps(
+    paths: np.ndarray, shape: Tuple[int, int]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """All swaps as (step, i, j) arrays, i < j, agents swapping between rows step and step + 1."""
+    T, N, _ = paths.shape
+    empty = np.zeros(0, dtype=np.int64)
+    if T < 2 or N < 2:
+        return empty, empty, empty
+
+    _, cells = np.unique(position_keys(paths, shape), return_inverse=True)
+    cells = cells.reshape(T, N).astype(np.int64, copy=False)
+    K = int(cells.max()) + 1
+
+    steps, ii, jj = [empty], [empty], [empty]
+    # swap_pairs squares its key range; keep (block * K) ** 2 inside int64
+    block = max(1, (2**31) // K)
+    for t0 in range(0, T - 1, block):
+        src = cells[t0 : t0 + block]
+        dst = cells[t0 + 1 : t0 + block + 1]
+        tt = np.arange(dst.shape[0], dtype=np.int64)[:, None] * K
+        i, j = swap_pairs((tt + src[: dst.shape[0]]).reshape(-1), (tt + dst).reshape(-1))
+        step, i = np.divmod(i, N)
+        steps.append(step + t0)
+        ii.append(i)
+        jj.append(j % N)
+    return np.concatenate(steps), np.concatenate(ii), np.concatenate(jj)
+
+
+def _window_conflicts(
+    grid: GridLike,
+    window: np.ndarray,
+    connectivity: Connectivity,
+    t0: int,
+    overlap: bool,
+    check_moves: bool = True,
+) -> np.ndarray:
+    """Every conflict in `window` (see `_check_window`) as CONFLICT_DTYPE records."""
+    N = window.shape[1]
+    first = 1 if overlap else 0
+    own = window[first:]
+    parts = []
+
+    def records(code: int, r: np.ndarray, i: np.ndarray, j=None) -> np.ndarray:
+        # r: row index into `window`
+        out = np.zeros(len(r), dtype=CONFLICT_DTYPE)
+        out["time"] = t0 + r
+        out["type"] = code
+        out["agent_i"] = i
+        out["agent_j"] = -1 if j is None else j
+        out["row"], out["col"] = window[r, i, 0], window[r, i, 1]
+        prev = np.maximum(r - 1, 0)
+        out["prev_row"], out["prev_col"] = window[prev, i, 0], window[prev, i, 1]
+        return out
+
+    oob, blocked = _position_masks(grid, own)
+    for code, mask in enumerate((oob, blocked)):
+        r, i = np.nonzero(mask)
+        parts.append(records(code, r + first, i))
+
+    if check_moves and window.shape[0] > 1:
+        _, legal = _move_deltas(window, connectivity)
+        r, i = np.nonzero(~legal)
+        parts.append(records(2, r + 1, i))
+
+    if own.shape[0] > 0 and N > 1:
+        order, starts, ends = _vertex_groups(own, grid.shape)
+        # every sorted position p inside a group pairs with the later ones
+        sizes = ends - starts
+        p = np.repeat(starts - (np.cumsum(sizes) - sizes), sizes) + np.arange(sizes.sum())
+        later = np.repeat(ends, sizes) - 1 - p
+        pi = np.repeat(p, later)
+        pj = pi + 1 + np.arange(len(pi)) - np.repeat(np.cumsum(later) - later, later)
+        r, i = np.divmod(order[pi], N)
+        parts.append(records(3, r + first, i, order[pj] % N))
+
+    step, i, j = _swap_steps(window, grid.shape)
+    parts.append(records(4, step + 1, i, j))
+
+    conflicts = np.concatenate(parts)
+    order = np.lexsort(
+        (conflicts["agent_j"], conflicts["agent_i"], conflicts["type"], conflicts["time"])
+    )
+    return conflicts[order]
+
+
+# ---------------------------------------------------------------
+# Windowed driver
+# ---------------------------------------------------------------
+def _shift(
+    entry: Tuple[int, Optional[Dict[str, Any]]], dt: int
+) -> Tuple[int, Optional[Dict[str, Any]]]:
+    count, error = entry
+    if error is None or dt == 0:
+        return count, error
+    return count, {**error, "time": error["time"] + dt}
+
+
+def _check_window(
+    grid: GridLike,
+    window: np.ndarray,
+    connectivity: Connectivity,
+    t0: int,
+    overlap: bool,
+    check_moves: bool = True,
+) -> CheckTotals:
+    """
+    Run every check on `window`, which holds rows t0, t0 + 1, ... of the
+    paths. With `overlap`, row 0 belongs to the previous window: it is only
+    the "previous" row for the move and swap checks of row 1. Without
+    `check_moves` the illegal-move check is skipped (reported as 0).
+    """
+    shape = grid.shape
+    own = window[1:] if overlap else window
+    t_own = t0 + 1 if overlap else t0
+
+    totals = {
+        kind: _shift(entry, t_own) for kind, entry in _position_errors(grid, own).items()
+    }
+    if check_moves:
+        totals["illegal_move"] = _shift(_illegal_moves(window, connectivity), t0)
+    else:
+        totals["illegal_move"] = (0, None)
+    totals["vertex_collision"] = _shift(_vertex_collisions(own, shape), t_own)
+    totals["edge_collision"] = _shift(_edge_collisions(window, shape), t0)
+    return totals
+
+
+def _merge(totals: CheckTotals, part: CheckTotals) -> None:
+    """Add `part` (a later time range) into `totals` in place."""
+    for kind, _ in _CHECKS:
+        count, error = totals.get(kind, (0, None))
+        part_count, part_error = part[kind]
+        totals[kind] = (count + part_count, error if error is not None else part_error)
 
-    allowed = _allowed_deltas(connectivity)
-
-    num_vertex_collisions = 0
-    num_edge_collisions = 0
-    num_illegal_moves = 0
-    num_out_of_bounds = 0
-    num_on_obstacle = 0
-
-    first_error: Optional[Dict[str, Any]] = None
-
-    # --- per-timestep position validity ---
-    for t in range(T):
-        pos_t = paths[t]  # shape (N, 2)
-        rows = pos_t[:, 0]
-        cols = pos_t[:, 1]
-
-        # bounds
-        oob_mask = (rows < 0) | (rows >= H) | (cols < 0) | (cols >= W)
-        if np.any(oob_mask):
-            idxs = np.where(oob_mask)[0]
-            num_out_of_bounds += int(len(idxs))
-            if first_error is None:
-                first_error = {
-                    "time": t,
-                    "type": "bounds",
-                    "agents": tuple(int(i) for i in idxs[:4]),
-                    "extra": {
-                        "positions": [tuple(map(int, pos_t[i])) for i in idxs[:4]]
-                    },
-                }
-
-        # obstacle
-        in_bounds_idxs = np.where(~oob_mask)[0]
-        if len(in_bounds_idxs) > 0:
-            r_in = rows[in_bounds_idxs]
-            c_in = cols[in_bounds_idxs]
-            blocked_mask = grid[r_in, c_in] == 1
-            if np.any(blocked_mask):
-                bad_local = np.where(blocked_mask)[0]
-                bad_idxs = in_bounds_idxs[bad_local]
-                num_on_obstacle += int(len(bad_idxs))
-                if first_error is None:
-                    first_error = {
-                        "time": t,
-                        "type": "obstacle",
-                        "agents": tuple(int(i) for i in bad_idxs[:4]),
-                        "extra": {
-                            "positions": [tuple(map(int, pos_t[i])) for i in bad_idxs[:4]]
-                        },
-                    }
-
-    # --- move legality (neighbor or wait) ---
-    for t in range(1, T):
-        prev = paths[t - 1]
-        curr = paths[t]
-        deltas = curr - prev  # (N, 2)
-        for i in range(N):
-            dr, dc = int(deltas[i, 0]), int(deltas[i, 1])
-            if (dr, dc) not in allowed:
-                num_illegal_moves += 1
-                if first_error is None:
-                    first_error = {
-                        "time": t,
-                        "type": "illegal_move",
-                        "agents": (int(i),),
-                        "extra": {"delta": (dr, dc)},
-                    }
-
-    # --- vertex collisions ---
-    for t in range(T):
-        pos_t = paths[t]
-        # map cell -> list of agents
-        cell_to_agents: Dict[Tuple[int, int], list] = {}
-        for i in range(N):
-            cell = (int(pos_t[i, 0]), int(pos_t[i, 1]))
-            cell_to_agents.setdefault(cell, []).append(i)
-
-        for cell, agents in cell_to_agents.items():
-            if len(agents) > 1:
-                # count number of unordered pairs
-                k = len(agents)
-                num_vertex_collisions += k * (k - 1) // 2
-                if first_error is None:
-                    first_error = {
-                        "time": t,
-                        "type": "vertex_collision",
-                        "agents": tuple(int(a) for a in agents),
-                        "extra": {"cell": cell},
-                    }
-
-    # --- edge collisions (swaps) ---
-    for t in range(1, T):
-        prev = paths[t - 1]
-        curr = paths[t]
-        for i in range(N):
-            for j in range(i + 1, N):
-                if (
-                    prev[i, 0] == curr[j, 0]
-                    and prev[i, 1] == curr[j, 1]
-                    and prev[j, 0] == curr[i, 0]
-                    and prev[j, 1] == curr[i, 1]
-                ):
-                    num_edge_collisions += 1
-                    if first_error is None:
-                        first_error = {
-                            "time": t,
-                            "type": "edge_collision",
-                            "agents": (int(i), int(j)),
-                            "extra": {
-                                "from_to_i": (
-                                    int(prev[i, 0]),
-                                    int(prev[i, 1]),
-                                    int(curr[i, 0]),
-                                    int(curr[i, 1]),
-                                ),
-                                "from_to_j": (
-                                    int(prev[j, 0]),
-                                    int(prev[j, 1]),
-                                    int(curr[j, 0]),
-                                    int(curr[j, 1]),
-                                ),
-                            },
-                        }
 
+def _first_error(totals: CheckTotals) -> Optional[Dict[str, Any]]:
+    """
+    Resolve per-type earliest errors in check order: bounds/obstacle by
+    time (bounds first at the same t), then illegal moves, vertex and edge
+    collisions.
+    """
+    positions = [
+        (error["time"], rank, error)
+        for rank, kind in enumerate(("bounds", "obstacle"))
+        for error in [totals[kind][1]]
+        if error is not None
+    ]
+    if positions:
+        return min(positions, key=lambda item: item[:2])[2]
+    for kind in ("illegal_move", "vertex_collision", "edge_collision"):
+        if totals[kind][1] is not None:
+            return totals[kind][1]
+    return None
+
+
+def _earliest_error(totals: CheckTotals) -> Optional[Dict[str, Any]]:
+    """Earliest error in time; at the same t, in check order."""
+    found = [
+        (error["time"], rank, error)
+        for rank, (kind, _) in enumerate(_CHECKS)
+        for error in [totals[kind][1]]
+        if error is not None
+    ]
+    if not found:
+        return None
+    return min(found, key=lambda item: item[:2])[2]
+
+
+def _summarize(
+    totals: CheckTotals,
+    paths: np.ndarray,
+    goals: Optional[np.ndarray],
+) -> Dict[str, Any]:
     # --- success flag (if goals provided) ---
     if goals is not None:
         if goals.shape != (paths.shape[1], 2):
@@ -180,22 +498,382 @@ def validate_paths(
     else:
         success = None
 
-    ok = (
-        num_out_of_bounds == 0
-        and num_on_obstacle == 0
-        and num_illegal_moves == 0
-        and num_vertex_collisions == 0
-        and num_edge_collisions == 0
-        and (success is not False)
-    )
+    counts = {key: int(totals[kind][0]) for kind, key in _CHECKS}
+    ok = all(c == 0 for c in counts.values()) and (success is not False)
 
     return {
         "ok": ok,
-        "first_error": first_error,
-        "num_vertex_collisions": int(num_vertex_collisions),
-        "num_edge_collisions": int(num_edge_collisions),
-        "num_illegal_moves": int(num_illegal_moves),
-        "num_out_of_bounds": int(num_out_of_bounds),
-        "num_on_obstacle": int(num_on_obstacle),
+        "first_error": _first_error(totals),
+        "num_vertex_collisions": counts["num_vertex_collisions"],
+        "num_edge_collisions": counts["num_edge_collisions"],
+        "num_illegal_moves": counts["num_illegal_moves"],
+        "num_out_of_bounds": counts["num_out_of_bounds"],
+        "num_on_obstacle": counts["num_on_obstacle"],
         "success": success,
     }
+
+
+def validate_paths(
+    grid: GridLike,
+    paths: np.ndarray,
+    *,
+    starts: Optional[np.ndarray] = None,
+    goals: Optional[np.ndarray] = None,
+    connectivity: Connectivity = "4",
+    chunk_size: Optional[int] = None,
+    fail_fast: bool = False,
+    num_workers: Optional[int] = 0,
+    return_conflicts: bool = False,
+) -> Dict[str, Any]:
+    """
+    Check (T, N, 2) paths for out-of-bounds and on-obstacle positions,
+    illegal moves, vertex collisions and swaps. `grid` may be a PackedGrid;
+    obstacle lookups then read its bits and workers share it packed.
+
+    With `chunk_size`, time is processed in windows of that many rows (plus
+    one row of overlap for moves and swaps), so only one window is ever
+    materialized; this is what makes `np.load(..., mmap_mode="r")` inputs
+    run in bounded memory. Results do not depend on `chunk_size`.
+
+    With `fail_fast`, time is scanned in order (small windows first) and the
+    scan stops at the first timestep with any violation. `first_error` is
+    then the earliest error in time (bounds, obstacle, illegal move, vertex,
+    edge at the same t) rather than the first by check type, and the counts
+    only cover timesteps up to and including that one.
+
+    With `num_workers` != 0 (None = one per CPU), the time axis is split into
+    one shard per worker and the shards are checked on a process pool; the
+    merged result is identical to the serial one. Workers map a memory-mapped
+    `paths` file directly, otherwise `paths` is copied once into shared
+    memory. `fail_fast` scans are always serial.
+
+    With `return_conflicts`, the result also holds "conflicts": every
+    violation as one CONFLICT_DTYPE record (vertex collisions once per
+    colliding pair), sorted by time, type code, agent_i and agent_j. The
+    type code indexes CONFLICT_TYPES.
+    """
+    if paths.ndim != 3 or paths.shape[2] != 2:
+        raise ValueError(f"paths must have shape (T, N, 2); got {paths.shape}")
+
+    T = paths.shape[0]
+    if chunk_size is None:
+        step = 4096 if fail_fast else max(T, 1)
+    else:
+        step = int(chunk_size)
+    if step < 1:
+        raise ValueError(f"chunk_size must be >= 1, got {chunk_size}")
+    if num_workers is not None and num_workers < 0:
+        raise ValueError(f"num_workers must be >= 0 or None, got {num_workers}")
+
+    if fail_fast and return_conflicts:
+        raise ValueError("return_conflicts cannot be combined with fail_fast")
+
+    if fail_fast:
+        return _validate_fail_fast(grid, paths, goals, connectivity, step)
+
+    conflicts: Optional[List[np.ndarray]] = [] if return_conflicts else None
+    if num_workers != 0:
+        totals = _scan_sharded(grid, paths, connectivity, step, num_workers, conflicts)
+    else:
+        totals = _scan(grid, paths, connectivity, 0, T, step, conflicts)
+
+    result = _summarize(totals, paths, goals)
+    if conflicts is not None:
+        result["conflicts"] = np.concatenate(
+            [np.zeros(0, dtype=CONFLICT_DTYPE)] + conflicts
+        )
+    return result
+
+
+def _scan(
+    grid: GridLike,
+    paths: np.ndarray,
+    connectivity: Connectivity,
+    start: int,
+    stop: int,
+    step: int,
+    conflicts: Optional[List[np.ndarray]] = None,
+) -> CheckTotals:
+    """
+    Check timesteps [start, stop) in windows of `step` rows; if a
+    `conflicts` list is given, append each window's conflict records to it.
+    """
+    totals: CheckTotals = {}
+    for lo in range(start, max(stop, 1), step):
+        t0 = max(lo - 1, 0)
+        window = np.asarray(paths[t0 : min(lo + step, stop)])
+        _merge(totals, _check_window(grid, window, connectivity, t0, overlap=lo > 0))
+        if conflicts is not None:
+            conflicts.append(
+                _window_conflicts(grid, window, connectivity, t0, overlap=lo > 0)
+            )
+    return totals
+
+
+def _validate_fail_fast(
+    grid: GridLike,
+    paths: np.ndarray,
+    goals: Optional[np.ndarray],
+    connectivity: Connectivity,
+    max_window: int,
+) -> Dict[str, Any]:
+    T = paths.shape[0]
+    totals: CheckTotals = {}
+    start, size = 0, min(_FAIL_FAST_WINDOW, max_window)
+    while start < max(T, 1):
+        t0 = max(start - 1, 0)
+        part = _check_window(
+            grid, np.asarray(paths[t0 : start + size]), connectivity, t0, overlap=start > 0
+        )
+        error = _earliest_error(part)
+        if error is not None:
+            # recount the window up to the failing timestep only
+            part = _check_window(
+                grid,
+                np.asarray(paths[t0 : error["time"] + 1]),
+                connectivity,
+                t0,
+                overlap=start > 0,
+            )
+            _merge(totals, part)
+            result = _summarize(totals, paths, goals)
+            result["first_error"] = error
+            return result
+
+        _merge(totals, part)
+        start += size
+        size = min(2 * size, max_window)
+
+    return _summarize(totals, paths, goals)
+
+
+# ---------------------------------------------------------------
+# Process-pool sharding
+# ---------------------------------------------------------------
+_worker_grid: Optional[GridLike] = None
+_worker_paths: Optional[np.ndarray] = None
+_worker_shms: List = []  # keeps shared blocks mapped for the worker's lifetime
+
+
+def _init_worker(grid_spec: SharedSpec, paths_source: Dict[str, Any]) -> None:
+    global _worker_grid, _worker_paths
+    shm, _worker_grid = attach_grid(grid_spec)
+    _worker_shms.append(shm)
+    if "filename" in paths_source:
+        _worker_paths = np.memmap(
+            paths_source["filename"],
+            dtype=np.dtype(paths_source["dtype"]),
+            mode="r",
+            offset=paths_source["offset"],
+            shape=paths_source["shape"],
+        )
+    else:
+        shm, _worker_paths = attach_array(paths_source)
+        _worker_shms.append(shm)
+
+
+def _scan_task(args) -> Tuple[CheckTotals, Optional[List[np.ndarray]]]:
+    connectivity, start, stop, step, with_conflicts = args
+    conflicts: Optional[List[np.ndarray]] = [] if with_conflicts else None
+    totals = _scan(
+        _worker_grid, _worker_paths, connectivity, start, stop, step, conflicts
+    )
+    return totals, conflicts
+
+
+def _scan_sharded(
+    grid: GridLike,
+    paths: np.ndarray,
+    connectivity: Connectivity,
+    step: int,
+    num_workers: Optional[int],
+    conflicts: Optional[List[np.ndarray]] = None,
+) -> CheckTotals:
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+
+    T = paths.shape[0]
+    bounds = np.linspace(0, T, num_workers + 1).astype(np.int64)
+    shards = [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+    if len(shards) < 2:
+        return _scan(grid, paths, connectivity, 0, T, step, conflicts)
+
+    owned = []
+    try:
+        shm, grid_spec = share_grid(grid)
+        owned.append(shm)
+        if (
+            isinstance(paths, np.memmap)
+            and paths.filename is not None
+            and paths.flags.c_contiguous
+            and isinstance(paths.base, mmap.mmap)  # not a slice: offset is exact
+        ):
+            # workers map the same file; nothing is copied
+            paths_source = {
+                "filename": paths.filename,
+                "dtype": paths.dtype.str,
+                "offset": paths.offset,
+                "shape": paths.shape,
+            }
+        else:
+            shm, paths_source = share_array(paths)
+            owned.append(shm)
+
+        tasks = [
+            (connectivity, a, b, min(step, b - a), conflicts is not None)
+            for a, b in shards
+        ]
+        with ProcessPoolExecutor(
+            max_workers=len(shards),
+            initializer=_init_worker,
+            initargs=(grid_spec, paths_source),
+        ) as pool:
+            parts = list(pool.map(_scan_task, tasks))
+    finally:
+        for shm in owned:
+            shm.close()
+            shm.unlink()
+
+    # shards come back in time order, so earlier errors win the merge
+    totals: CheckTotals = {}
+    for part, part_conflicts in parts:
+        _merge(totals, part)
+        if conflicts is not None:
+            conflicts.extend(part_conflicts)
+    return totals
+
+
+def validate_paths_file(
+    grid: GridLike,
+    paths_path: Union[str, Path],
+    *,
+    starts: Optional[np.ndarray] = None,
+    goals: Optional[np.ndarray] = None,
+    connectivity: Connectivity = "4",
+    chunk_size: int = 4096,
+    fail_fast: bool = False,
+    num_workers: Optional[int] = 0,
+    return_conflicts: bool = False,
+) -> Dict[str, Any]:
+    """
+    Validate a paths.npy file without loading it: the array is memory-mapped
+    read-only and checked `chunk_size` timesteps at a time. Other arguments
+    are passed through to `validate_paths`.
+    """
+    paths = np.load(str(paths_path), mmap_mode="r")
+    return validate_paths(
+        grid,
+        paths,
+        starts=starts,
+        goals=goals,
+        connectivity=connectivity,
+        chunk_size=chunk_size,
+        fail_fast=fail_fast,
+        num_workers=num_workers,
+        return_conflicts=return_conflicts,
+    )
+
+
+def validate_actions(
+    grid: GridLike,
+    starts: np.ndarray,
+    actions: np.ndarray,
+    *,
+    goals: Optional[np.ndarray] = None,
+    connectivity: Connectivity = "4",
+    chunk_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    `validate_paths` for an action-encoded path (starts (N, 2) + actions
+    (T-1, N), see `core.actions`). Every action is a unit move, so illegal
+    moves are read off the action ids; positions are decoded one window of
+    `chunk_size` timesteps at a time for the obstacle and collision checks.
+    """
+    actions = np.asarray(actions)
+    starts = np.asarray(starts)
+    if actions.ndim != 2 or starts.shape != (actions.shape[1], 2):
+        raise ValueError(
+            f"expected starts (N, 2) and actions (T-1, N); "
+            f"got {starts.shape} and {actions.shape}"
+        )
+
+    T = actions.shape[0] + 1
+    step = T if chunk_size is None else int(chunk_size)
+    if step < 1:
+        raise ValueError(f"chunk_size must be >= 1, got {chunk_size}")
+
+    totals: CheckTotals = {}
+    last = starts
+    for lo in range(0, T, step):
+        if lo == 0:
+            window = decode_actions(starts, actions[: step - 1])
+        else:
+            window = decode_actions(last, actions[lo - 1 : lo + step - 1])
+        part = _check_window(
+            grid, window, connectivity, max(lo - 1, 0), overlap=lo > 0, check_moves=False
+        )
+        _merge(totals, part)
+        last = window[-1]
+
+    totals["illegal_move"] = _illegal_actions(actions, connectivity)
+    return _summarize(totals, last[None], goals)
+
+
+# ---------------------------------------------------------------
+# Online validation
+# ---------------------------------------------------------------
+class IncrementalValidator:
+    """
+    Validate paths one timestep at a time, as a planner emits them.
+
+    Each `feed(row)` runs the same checks as `validate_paths` on the new
+    (N, 2) row against the previous one, so only the previous row and the
+    running counters are kept. `result()` returns the dict `validate_paths`
+    would return for all rows fed so far.
+    """
+
+    def __init__(
+        self,
+        grid: GridLike,
+        *,
+        goals: Optional[np.ndarray] = None,
+        connectivity: Connectivity = "4",
+    ):
+        self.grid = grid
+        self.goals = goals
+        self.connectivity: Connectivity = connectivity
+        self.t = 0  # number of rows fed
+        self._prev: Optional[np.ndarray] = None
+        self._totals: CheckTotals = {}
+
+    def feed(self, row: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Check the positions at time `t` and return this step's violations:
+        the earliest error (lowest agents) of each type found, in check order.
+        """
+        row = np.array(row)
+        if row.ndim != 2 or row.shape[1] != 2:
+            raise ValueError(f"row must have shape (N, 2); got {row.shape}")
+        if self._prev is not None and row.shape != self._prev.shape:
+            raise ValueError(
+                f"row must have shape {self._prev.shape} like the previous rows; "
+                f"got {row.shape}"
+            )
+
+        if self._prev is None:
+            part = _check_window(self.grid, row[None], self.connectivity, 0, overlap=False)
+        else:
+            window = np.stack([self._prev, row])
+            part = _check_window(
+                self.grid, window, self.connectivity, self.t - 1, overlap=True
+            )
+        _merge(self._totals, part)
+
+        self._prev = row
+        self.t += 1
+        return [part[kind][1] for kind, _ in _CHECKS if part[kind][1] is not None]
+
+    def result(self) -> Dict[str, Any]:
+        if self._prev is None:
+            raise ValueError("no rows have been fed yet")
+        return _summarize(self._totals, self._prev[None], self.goals)
@@ -0,0 +1,150 @@
+# mapf_env/core/vec_env.py
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .collisions import swap_pairs
+from .action_mask import illegal_moves, step_mask
+from .actions import MotionType, delta_table
+from .flat import in_bounds, to_flat
+from .instance import MAPFInstance
+
+
+class VecMAPFEnv:
+    """
+    B independent MAPF episodes on one shared grid, stepped together.
+
+    All instances must use the same grid and the same number of agents N.
+    Positions are held as one (B, N, 2) array and `step` takes a (B, N)
+    array of action ids. An episode is done when every agent sits on its
+    goal or, if `max_steps` is set, after `max_steps` steps; done slots are
+    reset automatically with the next instance from `instances` (cycling).
+    """
+
+    def __init__(
+        self,
+        instances: Sequence[MAPFInstance],
+        num_envs: Optional[int] = None,
+        motion: MotionType = "4",
+        max_steps: Optional[int] = None,
+    ):
+        if motion not in ("4", "8"):
+            raise ValueError(f"motion must be '4' or '8', got {motion}")
+        if len(instances) == 0:
+            raise ValueError("instances must not be empty")
+
+        first = instances[0]
+        for k, inst in enumerate(instances[1:], start=1):
+            if inst.num_agents != first.num_agents:
+                raise ValueError(
+                    f"all instances must have the same num_agents; "
+                    f"instance {k} has {inst.num_agents}, expected {first.num_agents}"
+                )
+            if inst.grid is not first.grid and not np.array_equal(inst.grid, first.grid):
+                raise ValueError(f"instance {k} does not share the grid of instance 0")
+
+        self.instances = list(instances)
+        self.num_envs = len(self.instances) if num_envs is None else int(num_envs)
+        if self.num_envs < 1:
+            raise ValueError(f"num_envs must be >= 1, got {self.num_envs}")
+
+        self.motion: MotionType = motion
+        self.max_steps = max_steps
+        self._delta_table = delta_table(motion)
+
+        self.grid = first.grid
+        self._action_mask = step_mask(self.grid, motion)
+        self.num_agents = first.num_agents
+
+        B, N = self.num_envs, self.num_agents
+        self.t = np.zeros(B, dtype=np.int64)
+        self.pos = np.zeros((B, N, 2), dtype=np.int64)
+        self.goals = np.zeros((B, N, 2), dtype=np.int64)
+        self.episode_instances: List[MAPFInstance] = [first] * B
+        self._next_instance = 0
+
+    # ---------------------------------------------------------------
+    # Core API
+    # ---------------------------------------------------------------
+    def reset(self) -> np.ndarray:
+        """Reset every slot with the next instances; return (B, N, 2) positions."""
+        self._next_instance = 0
+        self._reset_slots(np.arange(self.num_envs))
+        return self.pos.copy()
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, Dict]:
+        B, N = self.num_envs, self.num_agents
+        actions = np.asarray(actions)
+        if actions.shape != (B, N):
+            raise ValueError(f"Expected actions of shape {(B, N)}, got {actions.shape}")
+
+        H, W = self.grid.shape
+        prev_pos = self.pos
+
+        # --- action ids -> deltas (unknown ids are treated as WAIT) ---
+        ids = actions.astype(np.int64)
+        unknown = (ids < 0) | (ids >= len(self._delta_table))
+        ids[unknown] = 0
+        new_pos = prev_pos + self._delta_table[ids]
+
+        # --- bounds + obstacles via the mask (or packed bits), "invalid -> stay" ---
+        prev_flat = to_flat(prev_pos, W)
+        invalid = illegal_moves(self.grid, self._action_mask, prev_flat, new_pos, ids)
+        new_pos[invalid] = prev_pos[invalid]
+        new_flat = to_flat(new_pos, W)
+
+        # --- collisions, keyed by (slot, flat cell) so slots never interact ---
+        slot_offset = (np.arange(B, dtype=np.int64) * (H * W))[:, None]
+        src = (slot_offset + prev_flat).reshape(-1)
+        dst = (slot_offset + new_flat).reshape(-1)
+
+        _, inverse, counts = np.unique(dst, return_inverse=True, return_counts=True)
+        vertex = (counts[inverse.reshape(-1)] > 1).reshape(B, N)
+
+        edge = np.zeros(B * N, dtype=bool)
+        ii, jj = swap_pairs(src, dst)
+        edge[ii] = True
+        edge[jj] = True
+        edge = edge.reshape(B, N)
+
+        self.pos = new_pos
+        self.t += 1
+
+        done = np.all(new_pos == self.goals, axis=(1, 2))
+        if self.max_steps is not None:
+            done |= self.t >= self.max_steps
+
+        info = {
+            "t": self.t.copy(),
+            "invalid_moves": invalid,       # (B, N) bool
+            "unknown_actions": unknown,     # (B, N) bool
+            "vertex_collisions": vertex,    # (B, N) bool, agent shares its cell
+            "edge_collisions": edge,        # (B, N) bool, agent is part of a swap
+            "done": done,                   # (B,) bool, slot was auto-reset
+            "final_pos": new_pos.copy(),    # (B, N, 2) positions before auto-reset
+        }
+
+        done_idx = np.flatnonzero(done)
+        if len(done_idx) > 0:
+            self._reset_slots(done_idx)
+
+        return self.pos.copy(), info
+
+    # ---------------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------------
+    def _reset_slots(self, slots: np.ndarray) -> None:
+        for b in slots.tolist():
+            inst = self.instances[self._next_instance]
+            if not np.all(in_bounds(inst.starts, self.grid.shape)):
+                H, W = self.grid.shape
+                raise ValueError(f"start positions must lie inside the {H}x{W} grid")
+            self._next_instance = (self._next_instance + 1) % len(self.instances)
+
+            self.episode_instances[b] = inst
+            self.pos[b] = inst.starts
+            self.goals[b] = inst.goals
+            self.t[b] = 0
@@ -1,4 +1,13 @@
 from .movingai_map import load_map
-from .movingai_scene import load_scen
+from .movingai_scene import load_scen, load_scen_table
+from .cache import cached_load_map, cached_load_scen
+from .registry import MapRegistry
 
-__all__ = ["load_map", "load_scen"]
\ No newline at end of file
+__all__ = [
+    "load_map",
+    "load_scen",
+    "load_scen_table",
+    "cached_load_map",
+    "cached_load_scen",
+    "MapRegistry",
+]
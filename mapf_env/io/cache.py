@@ -0,0 +1,108 @@
+# mapf_env/io/cache.py
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import IO, Callable, Optional, Tuple, Union
+
+import numpy as np
+
+from .movingai_map import load_map
+from .movingai_scene import load_scen
+
+PathLike = Union[str, Path]
+
+CACHE_DIR_ENV = "MAPF_CACHE_DIR"
+DEFAULT_CACHE_DIR = ".mapf_cache"
+
+# Bump when the parsers change what they return, to orphan old entries
+_CACHE_VERSION = 1
+
+
+def cache_dir(directory: Optional[PathLike] = None) -> Optional[Path]:
+    """
+    `directory`, else $MAPF_CACHE_DIR, else ./.mapf_cache. Setting
+    MAPF_CACHE_DIR to an empty string disables the cache (None).
+    """
+    if directory is not None:
+        return Path(directory)
+    value = os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)
+    return Path(value) if value else None
+
+
+def cache_path(source: PathLike, kind: str, directory: Path) -> Path:
+    """
+    Cache file for a parsed `source`, keyed on its resolved path, size and
+    mtime: editing or replacing the source file selects a new entry.
+    """
+    source = Path(source).resolve()
+    st = source.stat()
+    key = f"{source}|{st.st_size}|{st.st_mtime_ns}|{kind}|{_CACHE_VERSION}"
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    return directory / f"{source.stem}-{digest}.{kind}.npy"
+
+
+def _atomic_write(path: Path, write_fn: Callable[[IO], None], mode: str = "wb") -> None:
+    """
+    Create `path` by calling `write_fn` on a temp file in the same directory
+    and renaming it into place, so concurrent readers never see a partial
+    file. The temp file is removed if anything fails; errors propagate.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            write_fn(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _cached(
+    source: PathLike,
+    kind: str,
+    parse: Callable[[Path], np.ndarray],
+    directory: Optional[PathLike],
+) -> np.ndarray:
+    root = cache_dir(directory)
+    if root is None:
+        return parse(Path(source))
+
+    entry = cache_path(source, kind, root)
+    try:
+        return np.load(entry, mmap_mode="r")
+    except (OSError, ValueError):
+        pass  # not cached yet, or unmappable (zero-size arrays)
+
+    arr = parse(Path(source))
+    try:
+        _atomic_write(entry, lambda f: np.save(f, arr))
+        return np.load(entry, mmap_mode="r")
+    except (OSError, ValueError):
+        return arr  # read-only or full cache dir: the parse still succeeded
+
+
+def cached_load_map(path: PathLike, directory: Optional[PathLike] = None) -> np.ndarray:
+    """
+    `load_map` through the on-disk cache.
+
+    The grid is returned as a read-only memory map of the cached .npy, so
+    repeat loads skip parsing and processes share the same pages.
+    """
+    return _cached(path, "map", load_map, directory)
+
+
+def cached_load_scen(
+    path: PathLike, directory: Optional[PathLike] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """`load_scen` through the on-disk cache; (starts, goals) are read-only."""
+
+    def parse(p: Path) -> np.ndarray:
+        starts, goals = load_scen(p)
+        return np.stack([starts.reshape(-1, 2), goals.reshape(-1, 2)])  # (2, M, 2)
+
+    both = _cached(path, "scen", parse, directory)
+    return both[0], both[1]
@@ -1,59 +1,49 @@
 from pathlib import Path
-from typing import Union
+from typing import List, Union
 import numpy as np
 
 PathLike = Union[str, Path]
 
+# byte -> cell: '.' is free (0); '@', 'T' and any unknown character block (1)
+_CELL_LUT = np.ones(256, dtype=np.int8)
+_CELL_LUT[ord(".")] = 0
+
+
+def _split_lines(data: bytes) -> List[bytes]:
+    """Split like text-mode readline: '\\r\\n', '\\r' and '\\n' all end a line."""
+    data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    lines = data.split(b"\n")
+    if lines[-1] == b"":
+        lines.pop()  # text after the last newline is a line only if non-empty
+    return lines
+
+
 def load_map(path: PathLike) -> np.ndarray:
     path = Path(path)
 
-    with path.open("r") as f:
-        first = f.readline().strip()
-
-        if first.startswith("type"):
-            height_line = f.readline().strip()
-            width_line = f.readline().strip()
-            map_line = f.readline().strip()
-            assert map_line.lower().startswith("map")
-
-            height = int(height_line.split()[1])
-            width = int(width_line.split()[1])
-
-            rows = []
-            for _ in range(height):
-                line = f.readline()
-                if not line:
-                    break
-                # Strip newline and ensure consistent width
-                line_stripped = line.rstrip('\n\r')
-                # Pad or truncate to expected width
-                if len(line_stripped) < width:
-                    line_stripped = line_stripped.ljust(width, '@')  # Pad with obstacles
-                elif len(line_stripped) > width:
-                    line_stripped = line_stripped[:width]  # Truncate
-                rows.append(list(line_stripped))
-            
-            # If we read fewer rows than expected, pad with obstacles
-            while len(rows) < height:
-                rows.append(['@'] * width)
-        else:
-            rows = [list(first)]
-            for line in f:
-                rows.append(list(line.rstrip()))
-            height = len(rows)
-            width = len(rows[0]) if height > 0 else 0
-
-    grid_chars = np.array(rows, dtype="U1")
-    assert grid_chars.shape == (height, width)
-
-    grid = np.zeros(grid_chars.shape, dtype=np.int8)
-
-    free_mask = (grid_chars == ".")
-    obstacle_mask = (grid_chars == "@") | (grid_chars == "T")
-
-    unknown_mask = ~(free_mask | obstacle_mask)
-
-    grid[free_mask] = 0
-    grid[obstacle_mask | unknown_mask] = 1
+    lines = _split_lines(path.read_bytes())
+    first = lines[0].strip() if lines else b""
+
+    if first.startswith(b"type"):
+        height_line = lines[1].strip()
+        width_line = lines[2].strip()
+        map_line = lines[3].strip()
+        assert map_line.lower().startswith(b"map")
+
+        height = int(height_line.split()[1])
+        width = int(width_line.split()[1])
+
+        # Pad short rows / missing rows with obstacles, truncate long rows
+        body = [line[:width].ljust(width, b"@") for line in lines[4 : 4 + height]]
+        body.extend([b"@" * width] * (height - len(body)))
+    else:
+        body = [first] + [line.rstrip() for line in lines[1:]]
+        height = len(body)
+        width = len(body[0])
+        if any(len(line) != width for line in body):
+            raise ValueError(f"rows of {path} have different lengths")
+
+    cells = np.frombuffer(b"".join(body), dtype=np.uint8)
+    grid = _CELL_LUT[cells].reshape(height, width)
 
     return grid
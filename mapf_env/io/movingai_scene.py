@@ -1,5 +1,6 @@
 # mapf_env/io/movingai_scen.py
 
+import warnings
 from pathlib import Path
 from typing import Tuple, Union
 
@@ -7,33 +8,65 @@ import numpy as np
 
 PathLike = Union[str, Path]
 
+# One row per MovingAI scen line, columns in file order. The map name is
+# parsed as an object and narrowed to the longest name afterwards, so no
+# fixed width can truncate it.
+_SCEN_PARSE_DTYPE = np.dtype(
+    [
+        ("bucket", np.int32),
+        ("map", object),
+        ("width", np.int32),
+        ("height", np.int32),
+        ("start_col", np.int32),
+        ("start_row", np.int32),
+        ("goal_col", np.int32),
+        ("goal_row", np.int32),
+        ("optimal_length", np.float64),
+    ]
+)
 
-def load_scen(path: PathLike) -> Tuple[np.ndarray, np.ndarray]:
-    path = Path(path)
-
-    start_locations = []
-    goal_locations = []
 
-    with path.open("r") as f:
-        for line in f:
-            line = line.rstrip()
-            if not line or line.startswith("version"):
-                continue
+def load_scen_table(path: PathLike) -> np.ndarray:
+    """
+    Parse a whole .scen file in one `np.loadtxt` call into a structured
+    array with fields bucket, map, width, height, start_col, start_row,
+    goal_col, goal_row and optimal_length. `map` is a str field as wide as
+    the longest map name. Blank and "version" header lines are skipped and
+    trailing whitespace is stripped; a line without exactly 9 tab-separated
+    fields raises ValueError.
+    """
+    with Path(path).open("r") as f, warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)  # header-only file
+        raw = np.loadtxt(
+            (
+                line.rstrip()
+                for line in f
+                if line.strip() and not line.startswith("version")
+            ),
+            dtype=_SCEN_PARSE_DTYPE,
+            delimiter="\t",
+            comments=None,
+            ndmin=1,
+        )
 
-            tokens = line.split("\t")
-            # Expected format: 9 fields per MovingAI scen line
-            assert len(tokens) == 9, f"Unexpected scen format in line: {line}"
+    names = raw["map"].astype(str)
+    table = np.empty(
+        raw.shape,
+        dtype=[
+            (field, names.dtype if field == "map" else _SCEN_PARSE_DTYPE[field])
+            for field in _SCEN_PARSE_DTYPE.names
+        ],
+    )
+    for field in _SCEN_PARSE_DTYPE.names:
+        table[field] = names if field == "map" else raw[field]
+    return table
 
-            # tokens[4:] are: start_col, start_row, goal_col, goal_row, distance
-            start_col = int(tokens[4])
-            start_row = int(tokens[5])
-            goal_col = int(tokens[6])
-            goal_row = int(tokens[7])
 
-            start_locations.append((start_row, start_col))
-            goal_locations.append((goal_row, goal_col))
+def load_scen(path: PathLike) -> Tuple[np.ndarray, np.ndarray]:
+    """(starts, goals) as (M, 2) int arrays of (row, col)."""
+    table = load_scen_table(path)
 
-    starts = np.array(start_locations, dtype=int)
-    goals = np.array(goal_locations, dtype=int)
+    starts = np.stack([table["start_row"], table["start_col"]], axis=1).astype(int)
+    goals = np.stack([table["goal_row"], table["goal_col"]], axis=1).astype(int)
 
     return starts, goals
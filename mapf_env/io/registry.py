@@ -0,0 +1,214 @@
+# mapf_env/io/registry.py
+
+import hashlib
+import json
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .cache import _atomic_write, cache_dir, cached_load_map
+
+PathLike = Union[str, Path]
+
+# Bump when the index layout changes, to force a rescan of old files
+_INDEX_VERSION = 1
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None  # missing directory: indexed as empty
+
+
+def _scen_sort_key(path: Path) -> Tuple[str, int]:
+    """'<map>-random-10.scen' sorts after '<map>-random-2.scen'."""
+    prefix, _, number = path.stem.rpartition("-")
+    return (prefix, int(number)) if number.isdigit() else (path.stem, -1)
+
+
+class MapRegistry:
+    """
+    Index of the maps in `maps_dir` and their '<map>-random-*.scen' files
+    in `scen_dir`, with each map's grid shape and free-cell count.
+
+    The index is built by scanning both directories once and is persisted as
+    JSON (under the parse cache dir unless `index_path` is given). It is
+    reused while neither directory's mtime changes, i.e. until files are
+    added, removed or renamed; on a rescan, maps whose size and mtime are
+    unchanged keep their entries without being parsed again.
+
+    Grids are loaded lazily through `cached_load_map` and the most recently
+    used `cache_size` of them are kept in memory.
+    """
+
+    def __init__(
+        self,
+        maps_dir: PathLike = "data/mapf-map",
+        scen_dir: PathLike = "data/scens",
+        *,
+        index_path: Optional[PathLike] = None,
+        cache_size: int = 8,
+    ):
+        if cache_size < 0:
+            raise ValueError(f"cache_size must be >= 0; got {cache_size}")
+        self.maps_dir = Path(maps_dir)
+        self.scen_dir = Path(scen_dir)
+        self.cache_size = cache_size
+        self.index_path = (
+            Path(index_path) if index_path is not None else self._default_index_path()
+        )
+        self._grids: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._index = self._load_or_build()
+
+    # ---------------------------------------------------------------
+    # Index
+    # ---------------------------------------------------------------
+    def _default_index_path(self) -> Optional[Path]:
+        root = cache_dir()
+        if root is None:
+            return None
+        key = f"{self.maps_dir.resolve()}|{self.scen_dir.resolve()}"
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return root / f"registry-{digest}.json"
+
+    def _read_index(self) -> Optional[Dict[str, Any]]:
+        if self.index_path is None:
+            return None
+        try:
+            with self.index_path.open("r") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(index, dict) or index.get("version") != _INDEX_VERSION:
+            return None
+        return index
+
+    def _is_fresh(self, index: Dict[str, Any]) -> bool:
+        return (
+            index["maps_dir"] == str(self.maps_dir.resolve())
+            and index["scen_dir"] == str(self.scen_dir.resolve())
+            and index["maps_mtime_ns"] == _mtime_ns(self.maps_dir)
+            and index["scen_mtime_ns"] == _mtime_ns(self.scen_dir)
+        )
+
+    def _load_or_build(self) -> Dict[str, Any]:
+        index = self._read_index()
+        if index is not None and self._is_fresh(index):
+            return index
+        return self._build(previous=index)
+
+    def _build(self, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        old_maps = previous["maps"] if previous is not None else {}
+
+        scens: Dict[str, List[Path]] = {}
+        if self.scen_dir.is_dir():
+            for path in self.scen_dir.glob("*-random-*.scen"):
+                name = path.stem.rsplit("-random-", 1)[0]
+                scens.setdefault(name, []).append(path)
+
+        maps: Dict[str, Dict[str, Any]] = {}
+        map_files = sorted(self.maps_dir.glob("*.map")) if self.maps_dir.is_dir() else []
+        for map_path in map_files:
+            st = map_path.stat()
+            entry = old_maps.get(map_path.stem)
+            if (
+                entry is None
+                or entry["size"] != st.st_size
+                or entry["mtime_ns"] != st.st_mtime_ns
+            ):
+                grid = cached_load_map(map_path)
+                entry = {
+                    "size": st.st_size,
+                    "mtime_ns": st.st_mtime_ns,
+                    "shape": list(grid.shape),
+                    "num_free": int(np.count_nonzero(grid == 0)),
+                }
+            entry = dict(entry)
+            entry["scens"] = [
+                p.name for p in sorted(scens.get(map_path.stem, []), key=_scen_sort_key)
+            ]
+            maps[map_path.stem] = entry
+
+        index = {
+            "version": _INDEX_VERSION,
+            "maps_dir": str(self.maps_dir.resolve()),
+            "scen_dir": str(self.scen_dir.resolve()),
+            "maps_mtime_ns": _mtime_ns(self.maps_dir),
+            "scen_mtime_ns": _mtime_ns(self.scen_dir),
+            "maps": maps,
+        }
+        self._write_index(index)
+        return index
+
+    def _write_index(self, index: Dict[str, Any]) -> None:
+        if self.index_path is None:
+            return
+        try:
+            _atomic_write(self.index_path, lambda f: json.dump(index, f), mode="w")
+        except OSError:
+            pass  # unwritable cache dir: the in-memory index still works
+
+    def refresh(self) -> None:
+        """Rescan both directories now (e.g. after editing a map in place)."""
+        self._grids.clear()
+        self._index = self._build(previous=self._index)
+
+    # ---------------------------------------------------------------
+    # Lookups
+    # ---------------------------------------------------------------
+    @property
+    def names(self) -> List[str]:
+        """Indexed map names, sorted."""
+        return sorted(self._index["maps"])
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index["maps"]
+
+    def __len__(self) -> int:
+        return len(self._index["maps"])
+
+    def _entry(self, name: str) -> Dict[str, Any]:
+        try:
+            return self._index["maps"][name]
+        except KeyError:
+            raise ValueError(f"Map {name!r} not found in {self.maps_dir}") from None
+
+    def map_path(self, name: str) -> Path:
+        """'<maps_dir>/<name>.map' (whether or not it exists)."""
+        return self.maps_dir / f"{name}.map"
+
+    def scen_files(self, name: str) -> List[Path]:
+        """The map's '<name>-random-*.scen' files, in numeric order."""
+        entry = self._index["maps"].get(name)
+        if entry is None:
+            return []
+        return [self.scen_dir / scen for scen in entry["scens"]]
+
+    def scen_path(self, name: str) -> Optional[Path]:
+        """First random scen of the map, or None if it has none."""
+        files = self.scen_files(name)
+        return files[0] if files else None
+
+    def shape(self, name: str) -> Tuple[int, int]:
+        height, width = self._entry(name)["shape"]
+        return height, width
+
+    def num_free(self, name: str) -> int:
+        return self._entry(name)["num_free"]
+
+    def grid(self, name: str) -> np.ndarray:
+        """The map's grid, from the in-memory LRU or `cached_load_map`."""
+        if name in self._grids:
+            self._grids.move_to_end(name)
+            return self._grids[name]
+
+        self._entry(name)
+        grid = cached_load_map(self.map_path(name))
+        if self.cache_size > 0:
+            self._grids[name] = grid
+            if len(self._grids) > self.cache_size:
+                self._grids.popitem(last=False)
+        return grid
@@ -106,54 +106,51 @@ import numpy as np
 import matplotlib.pyplot as plt
 import imageio.v2 as imageio  # pip install imageio if you don't have it
 
+from core.collisions import crowded_groups, swap_pairs
+from core.flat import position_keys
+
 
 def _compute_vertex_collisions(
     pos: np.ndarray,
+    shape: Optional[Tuple[int, int]] = None,
 ) -> List[Tuple[Tuple[int, int], Tuple[int, ...]]]:
     """
     Return list of (cell, agents) for any cell with >= 2 agents.
     """
-    cell_to_agents: Dict[Tuple[int, int], List[int]] = {}
-    N = pos.shape[0]
-    for i in range(N):
-        cell = (int(pos[i, 0]), int(pos[i, 1]))
-        cell_to_agents.setdefault(cell, []).append(i)
-
+    keys = position_keys(pos, shape)
     collisions = []
-    for cell, agents in cell_to_agents.items():
-        if len(agents) > 1:
-            collisions.append((cell, tuple(agents)))
+    for agents in crowded_groups(keys):
+        cell = (int(pos[agents[0], 0]), int(pos[agents[0], 1]))
+        collisions.append((cell, tuple(agents.tolist())))
     return collisions
 
 
 def _compute_edge_collisions(
     prev_pos: np.ndarray,
     curr_pos: np.ndarray,
+    shape: Optional[Tuple[int, int]] = None,
 ) -> List[Tuple[Tuple[int, int], Tuple[int, int, int, int, int, int]]]:
 
-    collisions = []
+    # one key space for both timesteps so from/to cells are comparable
+    keys = position_keys(np.concatenate([prev_pos, curr_pos]), shape)
     N = prev_pos.shape[0]
-    for i in range(N):
-        for j in range(i + 1, N):
-            if (
-                prev_pos[i, 0] == curr_pos[j, 0]
-                and prev_pos[i, 1] == curr_pos[j, 1]
-                and prev_pos[j, 0] == curr_pos[i, 0]
-                and prev_pos[j, 1] == curr_pos[i, 1]
-            ):
-                collisions.append(
-                    (
-                        (i, j),
-                        (
-                            int(prev_pos[i, 0]),
-                            int(prev_pos[i, 1]),
-                            int(curr_pos[i, 0]),
-                            int(curr_pos[i, 1]),
-                            int(prev_pos[j, 0]),
-                            int(prev_pos[j, 1]),
-                        ),
-                    )
-                )
+    ii, jj = swap_pairs(keys[:N], keys[N:])
+
+    collisions = []
+    for i, j in zip(ii.tolist(), jj.tolist()):
+        collisions.append(
+            (
+                (i, j),
+                (
+                    int(prev_pos[i, 0]),
+                    int(prev_pos[i, 1]),
+                    int(curr_pos[i, 0]),
+                    int(curr_pos[i, 1]),
+                    int(prev_pos[j, 0]),
+                    int(prev_pos[j, 1]),
+                ),
+            )
+        )
     return collisions
 
 
@@ -185,11 +182,11 @@ def animate_paths(
     if highlight_collisions:
         for t in range(T):
             pos_t = paths[t]
-            vertex_per_t[t] = _compute_vertex_collisions(pos_t)
+            vertex_per_t[t] = _compute_vertex_collisions(pos_t, (H, W))
         for t in range(1, T):
             prev = paths[t - 1]
             curr = paths[t]
-            edge_per_t[t] = _compute_edge_collisions(prev, curr)
+            edge_per_t[t] = _compute_edge_collisions(prev, curr, (H, W))
 
     # Iterate over downsampled timesteps
     for t in range(0, T, stride):
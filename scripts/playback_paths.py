@@ -5,8 +5,7 @@ from pathlib import Path
 
 import numpy as np
 
-from mapf_env.io.movingai_map import load_map
-from mapf_env.io.movingai_scene import load_scen
+from mapf_env.io.cache import cached_load_map, cached_load_scen
 from core.instance import instance_from_scen
 from mapf_env.viz.animate import animate_paths
 
@@ -87,7 +86,7 @@ def main():
         raise FileNotFoundError(f"Map file not found: {map_path}")
 
     print(f"Using map : {map_path}")
-    grid = load_map(map_path)
+    grid = cached_load_map(map_path)
     H, W = grid.shape
     print(f"Grid shape: H={H}, W={W}")
 
@@ -167,7 +166,7 @@ def main():
         if not scen_path.exists():
             raise FileNotFoundError(f"Scenario file not found: {scen_path}")
 
-        scen_starts, scen_goals = load_scen(scen_path)
+        scen_starts, scen_goals = cached_load_scen(scen_path)
 
         # Filter out invalid coordinates before creating instance
         H, W = grid.shape
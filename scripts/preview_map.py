@@ -4,7 +4,7 @@ import argparse
 import numpy as np
 import matplotlib.pyplot as plt
 
-from mapf_env.io.movingai_map import load_map
+from mapf_env.io.cache import cached_load_map
 from mapf_env.viz.render import render_map
 
 
@@ -17,7 +17,7 @@ def main():
     )
     args = parser.parse_args()
 
-    grid = load_map(args.map_path)
+    grid = cached_load_map(args.map_path)
 
     h, w = grid.shape
     num_free = int(np.sum(grid == 0))
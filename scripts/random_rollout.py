@@ -6,8 +6,8 @@ from pathlib import Path
 import numpy as np
 import matplotlib.pyplot as plt
 
-from mapf_env.io.movingai_map import load_map
-from mapf_env.io.movingai_scene import load_scen
+from mapf_env.io.cache import cached_load_map, cached_load_scen
+from mapf_env.io.registry import MapRegistry
 from core.instance import instance_from_scen
 from core.env import MAPFEnv
 
@@ -67,28 +67,26 @@ def main():
     args = parser.parse_args()
 
     # Resolve map & scen
-    map_path = Path(args.maps_dir) / f"{args.map}.map"
+    registry = MapRegistry(args.maps_dir, args.scen_dir)
+    map_path = registry.map_path(args.map)
     if not map_path.exists():
         raise FileNotFoundError(f"Map file not found: {map_path}")
 
     if args.scen_path is not None:
         scen_path = Path(args.scen_path)
     else:
-        # Try to find any available random scenario file for this map
-        scen_dir_path = Path(args.scen_dir)
-        scen_files = list(scen_dir_path.glob(f"{args.map}-random-*.scen"))
-        if scen_files:
-            scen_path = scen_files[0]  # Use the first available one
-        else:
-            scen_path = scen_dir_path / f"{args.map}-random-1.scen"  # Fallback
+        # First indexed random scenario file for this map
+        scen_path = registry.scen_path(args.map)
+        if scen_path is None:
+            scen_path = Path(args.scen_dir) / f"{args.map}-random-1.scen"  # Fallback
     if not scen_path.exists():
         raise FileNotFoundError(f"Scenario file not found: {scen_path}")
 
     print(f"Using map : {map_path}")
     print(f"Using scen: {scen_path}")
 
-    grid = load_map(map_path)
-    scen_starts, scen_goals = load_scen(scen_path)
+    grid = cached_load_map(map_path)
+    scen_starts, scen_goals = cached_load_scen(scen_path)
 
     instance = instance_from_scen(
         grid=grid,
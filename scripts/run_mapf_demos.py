@@ -10,9 +10,11 @@ from collections import deque
 from typing import List, Tuple, Optional, Set
 import numpy as np
 
-from mapf_env.io.movingai_map import load_map
-from mapf_env.io.movingai_scene import load_scen
+from mapf_env.io.cache import cached_load_scen
+from mapf_env.io.registry import MapRegistry
 from core.instance import MAPFInstance, instance_from_scen
+from core.actions import ACTION_DELTAS
+from core.action_mask import legal_action_mask, legal_deltas, sample_legal_actions
 from mapf_env.viz.animate import animate_paths
 
 
@@ -39,24 +41,20 @@ def astar_path(
     if reserved_cells is None:
         reserved_cells = set()
     
-    H, W = grid.shape
+    # Precomputed per-cell legal moves (bounds + obstacles), cached per grid
+    motion = "4" if motion == "4" else "8"
+    mask = legal_action_mask(grid, motion)
     sr, sc = start
     gr, gc = goal
     
-    # Check if start/goal are valid
-    if grid[sr, sc] == 1 or grid[gr, gc] == 1:
+    # Check if start/goal are valid (WAIT bit = cell is free)
+    if not (mask[sr, sc] & 1) or not (mask[gr, gc] & 1):
         return None
     
     # Heuristic: Manhattan distance
     def heuristic(r, c):
         return abs(r - gr) + abs(c - gc)
     
-    # Get neighbors based on motion model
-    if motion == "4":
-        deltas = [(0, 1), (1, 0), (-1, 0), (0, -1)]  # right, down, up, left
-    else:  # 8-connected
-        deltas = [(0, 1), (1, 0), (-1, 0), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
-    
     # A* search
     open_set = [(0, sr, sc)]  # (f, r, c)
     came_from = {}
@@ -82,17 +80,10 @@ def astar_path(
             path.reverse()
             return path
         
-        for dr, dc in deltas:
+        # Neighbors based on motion model, already in-bounds and obstacle-free
+        for dr, dc in legal_deltas(int(mask[r, c]), motion):
             nr, nc = r + dr, c + dc
             
-            # Check bounds
-            if nr < 0 or nr >= H or nc < 0 or nc >= W:
-                continue
-            
-            # Check obstacle
-            if grid[nr, nc] == 1:
-                continue
-            
             # Check reserved cells (for prioritized planning)
             if (nr, nc) in reserved_cells:
                 continue
@@ -125,60 +116,26 @@ def random_movement_planner(
     grid = instance.grid
     starts = instance.starts
     N = instance.num_agents
-    H, W = grid.shape
+    motion = "4" if motion == "4" else "8"
     
-    np.random.seed(seed)
+    rng = np.random.default_rng(seed)
     
-    # Get allowed deltas based on motion model
-    if motion == "4":
-        deltas = [(0, 1), (1, 0), (-1, 0), (0, -1), (0, 0)]  # right, down, up, left, wait
-    else:  # 8-connected
-        deltas = [(0, 1), (1, 0), (-1, 0), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1), (0, 0)]
+    # Per-cell legal actions (WAIT included); sampling is one lookup per agent
+    mask = legal_action_mask(grid, motion)
     
     # Initialize paths
     paths = np.zeros((max_timesteps, N, 2), dtype=np.int32)
-    current_pos = starts.copy()
+    current_pos = starts.astype(np.int32)
     
     for t in range(max_timesteps):
         # Store current positions
-        paths[t] = current_pos.copy()
+        paths[t] = current_pos
         
-        # Move each agent randomly
-        next_pos = current_pos.copy()
-        
-        for agent_id in range(N):
-            r, c = int(current_pos[agent_id, 0]), int(current_pos[agent_id, 1])
-            
-            # Try random moves until we find a valid one
-            attempts = 0
-            max_attempts = 20
-            
-            while attempts < max_attempts:
-                # Pick a random direction
-                dr, dc = deltas[np.random.randint(len(deltas))]
-                nr, nc = r + dr, c + dc
-                
-                # Check bounds
-                if nr < 0 or nr >= H or nc < 0 or nc >= W:
-                    attempts += 1
-                    continue
-                
-                # Check obstacle
-                if grid[nr, nc] == 1:
-                    attempts += 1
-                    continue
-                
-                # Valid move found
-                next_pos[agent_id, 0] = nr
-                next_pos[agent_id, 1] = nc
-                break
-            
-            # If no valid move found after max_attempts, stay put
-            if attempts >= max_attempts:
-                next_pos[agent_id, 0] = r
-                next_pos[agent_id, 1] = c
-        
-        current_pos = next_pos
+        # Move every agent with a uniformly random legal action
+        actions = sample_legal_actions(
+            mask[current_pos[:, 0], current_pos[:, 1]], rng, motion
+        )
+        current_pos = current_pos + ACTION_DELTAS[actions].astype(np.int32)
     
     return paths
 
@@ -280,33 +237,31 @@ def main():
     results_dir = Path(args.results_dir)
     results_dir.mkdir(exist_ok=True)
     
-    maps_dir = Path(args.maps_dir)
-    scen_dir = Path(args.scen_dir)
+    # One scan of maps_dir/scen_dir serves every map below
+    registry = MapRegistry(args.maps_dir, args.scen_dir)
     
     for map_name in args.maps:
         print(f"\n{'='*60}")
         print(f"Processing map: {map_name}")
         print(f"{'='*60}")
         
-        map_path = maps_dir / f"{map_name}.map"
-        if not map_path.exists():
-            print(f"Warning: Map file not found: {map_path}, skipping...")
+        if map_name not in registry:
+            print(f"Warning: Map file not found: {registry.map_path(map_name)}, skipping...")
             continue
         
         # Load map
-        grid = load_map(map_path)
+        grid = registry.grid(map_name)
         H, W = grid.shape
         print(f"Loaded map: {H}x{W}")
         
         # Try to load scenario file
         instance = None
         if args.use_scenarios:
-            scen_files = list(scen_dir.glob(f"{map_name}-random-*.scen"))
-            if scen_files:
-                scen_path = scen_files[0]
+            scen_path = registry.scen_path(map_name)
+            if scen_path is not None:
                 print(f"Using scenario: {scen_path}")
                 try:
-                    scen_starts, scen_goals = load_scen(scen_path)
+                    scen_starts, scen_goals = cached_load_scen(scen_path)
                     # Filter valid entries
                     valid_mask = (
                         (scen_starts[:, 0] >= 0) & (scen_starts[:, 0] < H) &
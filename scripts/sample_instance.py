@@ -5,20 +5,18 @@ from pathlib import Path
 
 import numpy as np
 
-from mapf_env.io.movingai_map import load_map
-from mapf_env.io.movingai_scene import load_scen
+from mapf_env.io.cache import cached_load_map, cached_load_scen
+from mapf_env.io.registry import MapRegistry
 from core.instance import MAPFInstance, instance_from_scen
 
 
 def default_paths(map_name: str, maps_dir: str, scen_dir: str):
-    map_path = Path(maps_dir) / f"{map_name}.map"
-    # Try to find any available random scenario file for this map
-    scen_dir_path = Path(scen_dir)
-    scen_files = list(scen_dir_path.glob(f"{map_name}-random-*.scen"))
-    if scen_files:
-        scen_path = scen_files[0]  # Use the first available one
-    else:
-        scen_path = scen_dir_path / f"{map_name}-random-1.scen"  # Fallback
+    registry = MapRegistry(maps_dir, scen_dir)
+    map_path = registry.map_path(map_name)
+    # First indexed random scenario file for this map
+    scen_path = registry.scen_path(map_name)
+    if scen_path is None:
+        scen_path = Path(scen_dir) / f"{map_name}-random-1.scen"  # Fallback
     return map_path, scen_path
 
 
@@ -80,8 +78,8 @@ def main():
     print(f"Map path : {map_path}")
     print(f"Scen path: {scen_path}")
 
-    grid = load_map(map_path)
-    scen_starts, scen_goals = load_scen(scen_path)
+    grid = cached_load_map(map_path)
+    scen_starts, scen_goals = cached_load_scen(scen_path)
 
     print(f"Loaded grid with shape HxW = {grid.shape}")
     print(f"Scenario entries available: {scen_starts.shape[0]}")
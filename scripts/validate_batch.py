@@ -0,0 +1,319 @@
+# scripts/validate_batch.py
+
+import argparse
+import csv
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from mapf_env.io.cache import cached_load_map, cached_load_scen
+from core.metrics import solution_metrics
+from core.validate import validate_paths
+
+# One output row per paths file, in this column order
+COLUMNS = [
+    "file",
+    "map",
+    "T",
+    "N",
+    "ok",
+    "success",
+    "num_out_of_bounds",
+    "num_on_obstacle",
+    "num_illegal_moves",
+    "num_vertex_collisions",
+    "num_edge_collisions",
+    "sum_of_costs",
+    "makespan",
+    "first_error_type",
+    "first_error_time",
+    "seconds",
+    "error",
+]
+
+# map name -> (grid, scen goals or None)
+MapTable = Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]]
+
+# map name -> (.map path, first random .scen path or None)
+MapSources = Dict[str, Tuple[Path, Optional[Path]]]
+
+
+def collect_files(inputs: List[str]) -> List[Path]:
+    """Expand directories (their *.npy files) and glob patterns, keeping order."""
+    files: List[Path] = []
+    for item in inputs:
+        if Path(item).is_dir():
+            matches = sorted(Path(item).glob("*.npy"))
+        else:
+            matches = sorted(Path(p) for p in glob.glob(item))
+        for path in matches:
+            if path not in files:
+                files.append(path)
+    return files
+
+
+def infer_map_name(paths_file: Path) -> Optional[str]:
+    """'<map>_paths.npy' -> '<map>' (the naming used by run_mapf_demos)."""
+    stem = paths_file.stem
+    if stem.endswith("_paths") and len(stem) > len("_paths"):
+        return stem[: -len("_paths")]
+    return None
+
+
+def find_scen(map_name: str, scen_dir: Path) -> Optional[Path]:
+    scen_files = sorted(scen_dir.glob(f"{map_name}-random-*.scen"))
+    return scen_files[0] if scen_files else None
+
+
+def load_maps(
+    map_names: List[str], maps_dir: Path, scen_dir: Optional[Path]
+) -> Tuple[MapSources, Dict[str, str]]:
+    """
+    Resolve each map and its first random scen, and load both once through
+    the parse cache so workers only map the cached arrays. Collects load
+    errors instead of raising.
+    """
+    sources: MapSources = {}
+    errors: Dict[str, str] = {}
+    for name in map_names:
+        map_path = maps_dir / f"{name}.map"
+        if not map_path.exists():
+            errors[name] = f"Map file not found: {map_path}"
+            continue
+        cached_load_map(map_path)
+
+        scen_path = None
+        if scen_dir is not None:
+            scen_path = find_scen(name, scen_dir)
+            if scen_path is not None:
+                cached_load_scen(scen_path)
+        sources[name] = (map_path, scen_path)
+    return sources, errors
+
+
+# ---------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------
+_worker_sources: MapSources = {}
+_worker_maps: MapTable = {}  # opened on first use, from the parse cache
+
+
+def _init_worker(sources: MapSources) -> None:
+    global _worker_sources, _worker_maps
+    _worker_sources = sources
+    _worker_maps = {}
+
+
+def _worker_map_table(map_name: str) -> MapTable:
+    """`_worker_maps`, with `map_name` opened via the cached loaders if new."""
+    if map_name not in _worker_maps:
+        map_path, scen_path = _worker_sources[map_name]
+        goals = None if scen_path is None else cached_load_scen(scen_path)[1]
+        _worker_maps[map_name] = (cached_load_map(map_path), goals)
+    return _worker_maps
+
+
+def validate_file(
+    paths_file: Path,
+    map_name: str,
+    maps: MapTable,
+    *,
+    offset: int = 0,
+    connectivity: str = "4",
+    chunk_size: int = 4096,
+) -> Dict[str, Any]:
+    row: Dict[str, Any] = {key: None for key in COLUMNS}
+    row["file"] = str(paths_file)
+    row["map"] = map_name
+
+    start = time.perf_counter()
+    try:
+        grid, scen_goals = maps[map_name]
+        paths = np.load(str(paths_file), mmap_mode="r")
+        if paths.ndim != 3 or paths.shape[2] != 2:
+            raise ValueError(f"paths.npy must have shape (T, N, 2), got {paths.shape}")
+        T, N, _ = paths.shape
+        row["T"], row["N"] = T, N
+
+        # success is checked against the first N scen goals when there are enough
+        goals = None
+        if scen_goals is not None and offset + N <= len(scen_goals):
+            goals = scen_goals[offset : offset + N]
+
+        result = validate_paths(
+            grid, paths, goals=goals, connectivity=connectivity, chunk_size=chunk_size
+        )
+        for key in COLUMNS:
+            if key in result:
+                row[key] = result[key]
+        first_error = result["first_error"]
+        if first_error is not None:
+            row["first_error_type"] = first_error["type"]
+            row["first_error_time"] = first_error["time"]
+        if goals is not None:
+            metrics = solution_metrics(paths, goals, chunk_size=chunk_size)
+            row["sum_of_costs"] = metrics["sum_of_costs"]
+            row["makespan"] = metrics["makespan"]
+    except Exception as e:
+        row["ok"] = False
+        row["error"] = f"{type(e).__name__}: {e}"
+
+    row["seconds"] = round(time.perf_counter() - start, 6)
+    return row
+
+
+def _validate_task(args) -> Dict[str, Any]:
+    paths_file, map_name, kwargs = args
+    return validate_file(paths_file, map_name, _worker_map_table(map_name), **kwargs)
+
+
+# ---------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------
+def write_table(rows: List[Dict[str, Any]], out_path: Path) -> None:
+    """Write rows as JSON lines for *.jsonl, CSV otherwise."""
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with out_path.open("w", newline="") as f:
+        if out_path.suffix == ".jsonl":
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+        else:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow({k: "" if v is None else v for k, v in row.items()})
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Validate many MAPF paths files in one process pool."
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="Directories (all *.npy inside) and/or glob patterns of paths files.",
+    )
+    parser.add_argument(
+        "--map",
+        default=None,
+        help="Map basename for every file. If not set, inferred from "
+             "'<map>_paths.npy' file names.",
+    )
+    parser.add_argument(
+        "--maps_dir",
+        type=str,
+        default="data/mapf-map",
+        help="Directory with .map files (default: data/mapf-map).",
+    )
+    parser.add_argument(
+        "--scen_dir",
+        type=str,
+        default="data/scens",
+        help="Directory with .scen files used for the success check "
+             "(default: data/scens).",
+    )
+    parser.add_argument(
+        "--no_goals",
+        action="store_true",
+        help="Skip the success check (do not load scenario files).",
+    )
+    parser.add_argument(
+        "--offset",
+        type=int,
+        default=0,
+        help="Scenario row offset (default: 0).",
+    )
+    parser.add_argument(
+        "--connectivity",
+        choices=["4", "8"],
+        default="4",
+        help="Grid connectivity for legality checks (4 or 8).",
+    )
+    parser.add_argument(
+        "--chunk_size",
+        type=int,
+        default=4096,
+        help="Timesteps validated per window (default: 4096).",
+    )
+    parser.add_argument(
+        "--num_workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: one per CPU; 0 = in-process).",
+    )
+    parser.add_argument(
+        "--out",
+        type=str,
+        default="validation_results.csv",
+        help="Output table; '.jsonl' writes JSON lines, anything else CSV "
+             "(default: validation_results.csv).",
+    )
+
+    args = parser.parse_args()
+
+    files = collect_files(args.inputs)
+    if not files:
+        raise FileNotFoundError(f"No paths files matched: {args.inputs}")
+    print(f"Files      : {len(files)}")
+
+    file_maps = [args.map or infer_map_name(f) for f in files]
+    map_names = sorted({m for m in file_maps if m is not None})
+    scen_dir = None if args.no_goals else Path(args.scen_dir)
+    sources, map_errors = load_maps(map_names, Path(args.maps_dir), scen_dir)
+    print(f"Maps       : {len(sources)} loaded, {len(map_errors)} missing")
+
+    kwargs = {
+        "offset": args.offset,
+        "connectivity": args.connectivity,
+        "chunk_size": args.chunk_size,
+    }
+    tasks = []
+    rows: List[Optional[Dict[str, Any]]] = [None] * len(files)
+    for i, (paths_file, map_name) in enumerate(zip(files, file_maps)):
+        if map_name is None or map_name in map_errors:
+            row = {key: None for key in COLUMNS}
+            row.update(file=str(paths_file), map=map_name, ok=False)
+            row["error"] = (
+                map_errors[map_name]
+                if map_name is not None
+                else "Cannot infer map name; pass --map"
+            )
+            rows[i] = row
+        else:
+            tasks.append((i, (paths_file, map_name, kwargs)))
+
+    start = time.perf_counter()
+    num_workers = args.num_workers
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    if num_workers == 0 or len(tasks) <= 1:
+        _init_worker(sources)
+        results = [_validate_task(task) for _, task in tasks]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_worker,
+            initargs=(sources,),
+        ) as pool:
+            results = list(pool.map(_validate_task, [task for _, task in tasks]))
+    for (i, _), row in zip(tasks, results):
+        rows[i] = row
+    elapsed = time.perf_counter() - start
+
+    out_path = Path(args.out)
+    write_table(rows, out_path)
+
+    num_ok = sum(bool(row["ok"]) for row in rows)
+    print(f"Valid      : {num_ok}/{len(rows)}")
+    print(f"Wall time  : {elapsed:.2f}s")
+    print(f"Results    : {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,11 @@ from pathlib import Path
 
 import numpy as np
 
-from mapf_env.io.movingai_map import load_map
-from mapf_env.io.movingai_scene import load_scen
+from mapf_env.io.cache import cached_load_map, cached_load_scen
+from core.actions import load_actions
 from core.instance import instance_from_scen
-from core.validate import validate_paths
+from core.metrics import action_solution_metrics, solution_metrics
+from core.validate import validate_actions, validate_paths
 
 
 def main():
@@ -18,7 +19,8 @@ def main():
     parser.add_argument(
         "paths_path",
         type=str,
-        help="Path to paths.npy (shape T x N x 2, (row, col)).",
+        help="Path to paths.npy (shape T x N x 2, (row, col)), or an "
+             "action-encoded .npz written by core.actions.save_actions.",
     )
     parser.add_argument(
         "--map",
@@ -65,8 +67,36 @@ def main():
     parser.add_argument(
         "--connectivity",
         choices=["4", "8"],
-        default="4",
-        help="Grid connectivity for legality checks (4 or 8).",
+        default=None,
+        help="Grid connectivity for legality checks (4 or 8). Defaults to the "
+             "motion stored in an actions .npz file, else 4.",
+    )
+    parser.add_argument(
+        "--chunk_size",
+        type=int,
+        default=4096,
+        help="Timesteps validated per window; paths.npy is memory-mapped, "
+             "so memory use is bounded by one window (default: 4096).",
+    )
+    parser.add_argument(
+        "--fail_fast",
+        action="store_true",
+        help="Stop at the first timestep with any violation; counts then "
+             "only cover timesteps up to that one.",
+    )
+    parser.add_argument(
+        "--num_workers",
+        type=int,
+        default=0,
+        help="Validate time shards on this many worker processes "
+             "(default: 0, in-process).",
+    )
+    parser.add_argument(
+        "--conflicts_out",
+        type=str,
+        default=None,
+        help="Save every conflict as a structured array to this .npy file "
+             "(fields: time, type, agent_i, agent_j, row, col, prev_row, prev_col).",
     )
 
     args = parser.parse_args()
@@ -80,7 +110,7 @@ def main():
     print(f"Map path   : {map_path}")
     if not map_path.exists():
         raise FileNotFoundError(f"Map file not found: {map_path}")
-    grid = load_map(map_path)
+    grid = cached_load_map(map_path)
     H, W = grid.shape
     print(f"Grid shape : H={H}, W={W}")
 
@@ -137,12 +167,27 @@ def main():
             f"\nPlease provide a valid path to a .npy file containing paths with shape (T, N, 2)."
         )
         raise FileNotFoundError(error_msg)
-    paths = np.load(str(paths_path))
-    if paths.ndim != 3 or paths.shape[2] != 2:
-        raise ValueError(
-            f"paths.npy must have shape (T, N, 2), got {paths.shape}"
-        )
-    T, N, _ = paths.shape
+    paths = actions = None
+    if paths_path.suffix == ".npz":
+        path_starts, actions, motion = load_actions(paths_path)
+        T, N = actions.shape[0] + 1, actions.shape[1]
+        print(f"Actions    : T-1={T - 1}, N={N}, motion={motion}")
+        if args.connectivity is None:
+            args.connectivity = motion
+        elif args.connectivity != motion:
+            print(
+                f"[WARN] --connectivity {args.connectivity} differs from the "
+                f"file's motion={motion}; validating with {args.connectivity}."
+            )
+    else:
+        if args.connectivity is None:
+            args.connectivity = "4"
+        paths = np.load(str(paths_path), mmap_mode="r")
+        if paths.ndim != 3 or paths.shape[2] != 2:
+            raise ValueError(
+                f"paths.npy must have shape (T, N, 2), got {paths.shape}"
+            )
+        T, N, _ = paths.shape
     print(f"Paths shape: T={T}, N={N}, 2")
 
     # Optional starts/goals from scenario for success check
@@ -166,7 +211,7 @@ def main():
                 f"Available scenario files in {args.scen_dir}: "
                 f"{list(Path(args.scen_dir).glob('*.scen'))[:5]}"
             )
-        scen_starts, scen_goals = load_scen(scen_path)
+        scen_starts, scen_goals = cached_load_scen(scen_path)
 
         instance = instance_from_scen(
             grid=grid,
@@ -185,13 +230,39 @@ def main():
             )
 
     # Run validation
-    result = validate_paths(
-        grid=grid,
-        paths=paths,
-        starts=starts,
-        goals=goals,
-        connectivity=args.connectivity,
-    )
+    if actions is not None:
+        # validate_actions is a serial, full scan without a conflict list
+        ignored = [
+            flag
+            for flag, used in [
+                ("--conflicts_out", args.conflicts_out is not None),
+                ("--fail_fast", args.fail_fast),
+                ("--num_workers", args.num_workers != 0),
+            ]
+            if used
+        ]
+        for flag in ignored:
+            print(f"[WARN] {flag} is only supported for paths.npy inputs; ignored.")
+        result = validate_actions(
+            grid,
+            path_starts,
+            actions,
+            goals=goals,
+            connectivity=args.connectivity,
+            chunk_size=args.chunk_size,
+        )
+    else:
+        result = validate_paths(
+            grid=grid,
+            paths=paths,
+            starts=starts,
+            goals=goals,
+            connectivity=args.connectivity,
+            chunk_size=args.chunk_size,
+            fail_fast=args.fail_fast,
+            num_workers=args.num_workers,
+            return_conflicts=args.conflicts_out is not None,
+        )
 
     print("\n=== Validation Report ===")
     print(f"OK (no errors + success if goals): {result['ok']}")
@@ -206,6 +277,23 @@ def main():
     else:
         print("  Success (end at goals)  : [not checked, no goals given]")
 
+    if goals is not None and goals.shape == (N, 2):
+        # windowed like validation, so neither input is fully materialized
+        if paths is None:
+            metrics = action_solution_metrics(
+                path_starts, actions, goals, chunk_size=args.chunk_size
+            )
+        else:
+            metrics = solution_metrics(paths, goals, chunk_size=args.chunk_size)
+        print("\n=== Solution Quality ===")
+        print(f"  Agents arrived          : {metrics['num_arrived']}/{N}")
+        print(f"  Sum of costs            : {metrics['sum_of_costs']}")
+        print(f"  Makespan                : {metrics['makespan']}")
+
+    if "conflicts" in result:
+        np.save(args.conflicts_out, result["conflicts"])
+        print(f"\nSaved {len(result['conflicts'])} conflicts to {args.conflicts_out}")
+
     first_error = result["first_error"]
     if first_error is not None:
         print("\nFirst error:")
@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""
+Strict tests for core/env.py (MAPFEnv)
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.action_mask import legal_action_mask, sample_legal_actions, set_legal_action_mask
+from core.env import MAPFEnv
+from core.instance import MAPFInstance
+from core.rollout import run_rollouts
+from core.recorder import TrajectoryRecorder
+from core.validate import validate_paths, validate_paths_file
+from core.vec_env import VecMAPFEnv
+
+
+def make_random_instance(H=12, W=10, N=30, obstacle_p=0.2, seed=0):
+    """Random grid with N agents on distinct free cells (goals shuffled)."""
+    rng = np.random.default_rng(seed)
+    grid = (rng.random((H, W)) < obstacle_p).astype(np.int8)
+    free = np.argwhere(grid == 0)
+    starts = free[rng.choice(len(free), size=N, replace=False)]
+    goals = free[rng.choice(len(free), size=N, replace=False)]
+    return MAPFInstance(grid=grid, starts=starts, goals=goals, num_agents=N)
+
+
+def reference_deltas(motion):
+    """Action id -> (dr, dc), as the original MAPFEnv defined it."""
+    four = {
+        0: (0, 0),   # WAIT
+        1: (0, 1),   # RIGHT
+        2: (1, 0),   # DOWN
+        3: (-1, 0),  # UP
+        4: (0, -1),  # LEFT
+    }
+    if motion == "4":
+        return four
+
+    diag = {
+        5: (1, 1),
+        6: (1, -1),
+        7: (-1, 1),
+        8: (-1, -1),
+    }
+    return {**four, **diag}
+
+
+def reference_step(grid, pos, actions, motion):
+    """Per-agent loop semantics of the original MAPFEnv.step."""
+    deltas = reference_deltas(motion)
+    H, W = grid.shape
+    new_pos = pos.copy()
+    invalid, unknown = [], []
+    for i in range(len(pos)):
+        a = int(actions[i])
+        if a not in deltas:
+            unknown.append(i)
+            dr, dc = 0, 0
+        else:
+            dr, dc = deltas[a]
+        r, c = int(pos[i, 0]), int(pos[i, 1])
+        rn, cn = r + dr, c + dc
+        if rn < 0 or rn >= H or cn < 0 or cn >= W or grid[rn, cn] == 1:
+            invalid.append(i)
+            rn, cn = r, c
+        new_pos[i] = (rn, cn)
+
+    cell_to_agents = {}
+    for i in range(len(new_pos)):
+        cell_to_agents.setdefault(tuple(int(x) for x in new_pos[i]), []).append(i)
+    vertex = [(c, tuple(a)) for c, a in cell_to_agents.items() if len(a) > 1]
+
+    edge = []
+    for i in range(len(pos)):
+        for j in range(i + 1, len(pos)):
+            if (
+                pos[i, 0] == new_pos[j, 0]
+                and pos[i, 1] == new_pos[j, 1]
+                and pos[j, 0] == new_pos[i, 0]
+                and pos[j, 1] == new_pos[i, 1]
+            ):
+                edge.append(
+                    (
+                        (i, j),
+                        (
+                            int(pos[i, 0]), int(pos[i, 1]),
+                            int(new_pos[i, 0]), int(new_pos[i, 1]),
+                            int(pos[j, 0]), int(pos[j, 1]),
+                        ),
+                    )
+                )
+    return new_pos, invalid, unknown, vertex, edge
+
+
+def test_step_matches_reference():
+    """Vectorized step reproduces the per-agent reference exactly"""
+    print("=" * 60)
+    print("TEST: step() matches per-agent reference")
+    print("=" * 60)
+
+    for motion in ["4", "8"]:
+        instance = make_random_instance(seed=int(motion))
+        env = MAPFEnv(instance, motion=motion)
+        env.reset()
+        rng = np.random.default_rng(1)
+        for _ in range(50):
+            # include unknown action ids (-1 and out of range)
+            actions = rng.integers(-1, 11, size=env.num_agents)
+            pos = env.pos.copy()
+            state, info = env.step(actions)
+            new_pos, invalid, unknown, vertex, edge = reference_step(
+                instance.grid, pos, actions, motion
+            )
+            assert np.array_equal(state.pos, new_pos)
+            assert info["invalid_moves"] == invalid
+            assert info["unknown_actions"] == unknown
+            assert info["vertex_collisions"] == vertex
+            assert info["edge_collisions"] == edge
+    print("✓ PASSED\n")
+
+
+def test_edge_collisions_swaps():
+    """Swaps (and co-located waits) are reported like the pairwise scan"""
+    print("=" * 60)
+    print("TEST: edge collisions on a crowded empty grid")
+    print("=" * 60)
+
+    grid = np.zeros((4, 4), dtype=np.int8)
+    rng = np.random.default_rng(3)
+    for _ in range(30):
+        N = 40
+        starts = rng.integers(0, 4, size=(N, 2))
+        instance = MAPFInstance(
+            grid=grid, starts=starts, goals=starts.copy(), num_agents=N
+        )
+        env = MAPFEnv(instance, motion="8")
+        env.reset()
+        actions = rng.integers(0, 9, size=N)
+        pos = env.pos.copy()
+        _, info = env.step(actions)
+        _, _, _, vertex, edge = reference_step(grid, pos, actions, "8")
+        assert info["vertex_collisions"] == vertex
+        assert info["edge_collisions"] == edge
+    print(f"last step: {len(info['edge_collisions'])} edge collisions")
+    print("✓ PASSED\n")
+
+
+def test_vec_env_matches_single_envs():
+    """VecMAPFEnv steps B episodes exactly like B separate MAPFEnvs"""
+    print("=" * 60)
+    print("TEST: VecMAPFEnv vs. independent MAPFEnv instances")
+    print("=" * 60)
+
+    base = make_random_instance(N=25, seed=7)
+    rng = np.random.default_rng(0)
+    free = np.argwhere(base.grid == 0)
+    instances = []
+    for _ in range(6):
+        idx = rng.choice(len(free), size=2 * base.num_agents, replace=False)
+        instances.append(
+            MAPFInstance(
+                grid=base.grid,
+                starts=free[idx[: base.num_agents]],
+                goals=free[idx[base.num_agents :]],
+                num_agents=base.num_agents,
+            )
+        )
+
+    B = 4
+    venv = VecMAPFEnv(instances, num_envs=B, motion="8", max_steps=7)
+    pos = venv.reset()
+    envs = [MAPFEnv(instances[b], motion="8") for b in range(B)]
+    for env in envs:
+        env.reset()
+    assert pos.shape == (B, base.num_agents, 2)
+
+    for _ in range(6):
+        actions = rng.integers(0, 9, size=(B, base.num_agents))
+        pos, info = venv.step(actions)
+        for b, env in enumerate(envs):
+            state, single = env.step(actions[b])
+            assert np.array_equal(info["final_pos"][b], state.pos)
+            assert np.flatnonzero(info["invalid_moves"][b]).tolist() == single["invalid_moves"]
+            vertex_agents = sorted(a for _, ag in single["vertex_collisions"] for a in ag)
+            assert np.flatnonzero(info["vertex_collisions"][b]).tolist() == vertex_agents
+            edge_agents = sorted({a for ag, _ in single["edge_collisions"] for a in ag})
+            assert np.flatnonzero(info["edge_collisions"][b]).tolist() == edge_agents
+
+    # max_steps=7: every slot is done on the next step and takes the next instance
+    pos, info = venv.step(np.zeros((B, base.num_agents), dtype=int))
+    assert info["done"].all()
+    assert np.array_equal(pos[0], instances[4].starts)
+    assert np.array_equal(pos[1], instances[5].starts)
+    assert np.array_equal(pos[2], instances[0].starts)
+    assert (venv.t == 0).all()
+    print("✓ PASSED\n")
+
+
+def test_vec_env_rejects_off_grid_starts():
+    """VecMAPFEnv.reset rejects starts outside the grid, like MAPFEnv.reset"""
+    print("=" * 60)
+    print("TEST: VecMAPFEnv with off-grid starts")
+    print("=" * 60)
+
+    base = make_random_instance(N=3, seed=9)
+    H, W = base.grid.shape
+    for bad_start in [(0, -1), (H, 0)]:
+        starts = base.starts.copy()
+        starts[1] = bad_start
+        bad = MAPFInstance(grid=base.grid, starts=starts, goals=base.goals, num_agents=3)
+        venv = VecMAPFEnv([base, bad], num_envs=1, max_steps=1)
+        venv.reset()
+        try:
+            venv.step(np.zeros((1, 3), dtype=int))  # auto-reset into `bad`
+        except ValueError as e:
+            print(f"Raised: {e}")
+        else:
+            raise AssertionError(f"start {bad_start} accepted")
+    print("✓ PASSED (correctly failed)\n")
+
+
+def test_zero_copy_states():
+    """zero_copy=True returns read-only views with the same contents"""
+    print("=" * 60)
+    print("TEST: zero-copy MAPFState views")
+    print("=" * 60)
+
+    instance = make_random_instance(seed=11)
+    env = MAPFEnv(instance, motion="4")
+    zc_env = MAPFEnv(instance, motion="4", zero_copy=True)
+    env.reset()
+    zc_state = zc_env.reset()
+    goals = zc_state.goals
+    assert not zc_state.pos.flags.writeable
+    assert not goals.flags.writeable
+    assert np.shares_memory(goals, instance.goals)
+
+    rng = np.random.default_rng(5)
+    buffers = set()
+    for _ in range(20):
+        actions = rng.integers(0, 5, size=env.num_agents)
+        state, info = env.step(actions)
+        zc_state, zc_info = zc_env.step(actions)
+        assert np.array_equal(state.pos, zc_state.pos)
+        assert info == zc_info
+        assert zc_state.goals is goals
+        buffers.add(zc_state.pos.__array_interface__["data"][0])
+    # positions alternate between exactly two preallocated buffers
+    assert len(buffers) == 2
+    print("✓ PASSED\n")
+
+
+def test_occupancy_tracks_positions():
+    """Incremental occupancy counts always equal a full recount"""
+    print("=" * 60)
+    print("TEST: incremental occupancy grid")
+    print("=" * 60)
+
+    grid = np.zeros((5, 5), dtype=np.int8)
+    grid[2, 1:4] = 1
+    rng = np.random.default_rng(9)
+    free = np.argwhere(grid == 0)
+    starts = free[rng.integers(0, len(free), size=30)]
+    instance = MAPFInstance(grid=grid, starts=starts, goals=starts.copy(), num_agents=30)
+    env = MAPFEnv(instance, motion="4")
+    env.reset()
+    for _ in range(40):
+        pos = env.pos.copy()
+        # mostly WAIT, as on dense maps
+        actions = np.where(rng.random(30) < 0.8, 0, rng.integers(1, 5, size=30))
+        state, info = env.step(actions)
+        expected = np.zeros_like(env.occupancy)
+        np.add.at(expected, (state.pos[:, 0], state.pos[:, 1]), 1)
+        assert env.occupancy.dtype == np.int32
+        assert np.array_equal(env.occupancy, expected)
+        _, _, _, vertex, _ = reference_step(grid, pos, actions, "4")
+        assert info["vertex_collisions"] == vertex
+    print("✓ PASSED\n")
+
+
+def test_trajectory_recording():
+    """Recorded trajectories grow past capacity, in RAM and memmap-backed"""
+    print("=" * 60)
+    print("TEST: trajectory recorder (in-memory and memmap)")
+    print("=" * 60)
+
+    instance = make_random_instance(N=8, seed=4)
+    with tempfile.TemporaryDirectory() as tmp:
+        for record_path in [None, Path(tmp) / "traj.npy"]:
+            env = MAPFEnv(instance, motion="4", record=True, record_path=record_path)
+            states = [env.reset().pos]
+            rng = np.random.default_rng(2)
+            for _ in range(600):
+                state, _ = env.step(rng.integers(0, 5, size=env.num_agents))
+                states.append(state.pos)
+
+            paths = env.trajectory
+            assert paths.shape == (601, 8, 2)
+            assert env.recorder.capacity == 1024
+            assert np.array_equal(paths, np.stack(states))
+            result = validate_paths(instance.grid, paths, connectivity="4")
+            assert result["num_illegal_moves"] == 0
+            assert result["num_on_obstacle"] == 0
+
+            env.reset()
+            assert env.trajectory.shape == (1, 8, 2)
+            del env, paths
+    print("✓ PASSED\n")
+
+
+def test_recorded_file_reloads():
+    """A memmap-backed recording is a .npy file that np.load reads back"""
+    print("=" * 60)
+    print("TEST: recorded .npy file reloads from disk")
+    print("=" * 60)
+
+    rng = np.random.default_rng(6)
+    rows = rng.integers(0, 100, size=(5, 3, 2)).astype(np.int32)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "traj.npy"
+        recorder = TrajectoryRecorder(3, capacity=4, path=path)
+        for row in rows[:3]:
+            recorder.append(row)
+        recorder.flush()
+        assert np.array_equal(np.load(path), rows[:3])
+
+        for row in rows[3:]:
+            recorder.append(row)  # grows past capacity 4
+        recorder.flush()
+        assert np.array_equal(np.load(path), rows)
+        assert np.array_equal(np.load(path, mmap_mode="r"), rows)
+
+        recorder.close()
+        size = path.stat().st_size
+        with path.open("rb") as f:
+            np.lib.format.read_magic(f)
+            np.lib.format.read_array_header_1_0(f)
+            assert size == f.tell() + rows.nbytes
+        assert np.array_equal(np.load(path), rows)
+        grid = np.zeros((100, 100), dtype=np.int8)
+        expected = validate_paths(grid, rows, connectivity="8")
+        assert validate_paths_file(grid, path, connectivity="8") == expected
+    print("✓ PASSED\n")
+
+
+def test_parallel_rollouts():
+    """Pool rollouts match in-process ones; counts agree with validate_paths"""
+    print("=" * 60)
+    print("TEST: run_rollouts on a process pool (shared-memory grid)")
+    print("=" * 60)
+
+    base = make_random_instance(N=20, seed=8)
+    rng = np.random.default_rng(0)
+    free = np.argwhere(base.grid == 0)
+    instances = []
+    for _ in range(5):
+        idx = rng.choice(len(free), size=base.num_agents, replace=False)
+        instances.append(
+            MAPFInstance(grid=base.grid, starts=free[idx], goals=base.goals, num_agents=20)
+        )
+
+    serial = run_rollouts(instances, steps=40, num_workers=0, seed=3)
+    parallel = run_rollouts(instances, steps=40, num_workers=2, seed=3)
+    for a, b, inst in zip(serial, parallel, instances):
+        assert a.index == b.index
+        assert a.paths.dtype == np.int16
+        assert np.array_equal(a.paths, b.paths)
+        assert np.array_equal(a.paths[0], inst.starts)
+        expected = validate_paths(inst.grid, a.paths)
+        assert a.num_vertex_collisions == expected["num_vertex_collisions"]
+        assert a.num_edge_collisions == expected["num_edge_collisions"]
+        assert a.num_vertex_collisions == b.num_vertex_collisions
+        assert a.num_invalid_moves == b.num_invalid_moves
+    print("✓ PASSED\n")
+
+
+def test_legal_action_mask():
+    """Bitmask matches a direct bounds/obstacle check; sampling stays legal"""
+    print("=" * 60)
+    print("TEST: legal-action bitmask")
+    print("=" * 60)
+
+    grid = make_random_instance(H=9, W=7, obstacle_p=0.3, seed=12).grid
+    H, W = grid.shape
+    for motion in ["4", "8"]:
+        mask = legal_action_mask(grid, motion)
+        assert mask.dtype == np.uint16 and mask.shape == (H, W)
+        assert legal_action_mask(grid, motion) is mask  # cached per grid
+        for (r, c), value in np.ndenumerate(mask):
+            for a, (dr, dc) in reference_deltas(motion).items():
+                rn, cn = r + dr, c + dc
+                legal = 0 <= rn < H and 0 <= cn < W and grid[rn, cn] == 0
+                assert bool((int(value) >> a) & 1) == legal, (r, c, a)
+
+        free = np.argwhere(grid == 0)
+        values = mask[free[:, 0], free[:, 1]]
+        actions = sample_legal_actions(values, np.random.default_rng(0), motion)
+        assert np.all((values >> actions.astype(np.uint16)) & 1)
+
+    # a registered mask (as pool workers do with the shared one) is reused
+    other = grid.copy()
+    shared = legal_action_mask(grid, "8").copy()
+    set_legal_action_mask(other, "8", shared)
+    assert legal_action_mask(other, "8") is shared
+    print("✓ PASSED\n")
+
+
+def test_snapshot_restore():
+    """restore() rewinds t, positions, occupancy and the recorded trajectory"""
+    print("=" * 60)
+    print("TEST: snapshot / restore")
+    print("=" * 60)
+
+    instance = make_random_instance(N=20, seed=13)
+    for zero_copy in [False, True]:
+        env = MAPFEnv(instance, motion="8", zero_copy=zero_copy, record=True)
+        env.reset()
+        rng = np.random.default_rng(4)
+        for _ in range(5):
+            env.step(rng.integers(0, 9, size=20))
+
+        token = env.snapshot()
+        pos = env.pos.copy()
+        occupancy = env.occupancy.copy()
+        trajectory = env.trajectory.copy()
+
+        branch_actions = rng.integers(0, 9, size=(10, 20))
+        infos = []
+        for actions in branch_actions:
+            infos.append(env.step(actions)[1])
+
+        state = env.restore(token)
+        assert state.t == 5 and env.t == 5
+        assert np.array_equal(state.pos, pos)
+        assert np.array_equal(env.occupancy, occupancy)
+        assert np.array_equal(env.trajectory, trajectory)
+
+        # replaying the branch gives identical step infos
+        for actions, info in zip(branch_actions, infos):
+            assert env.step(actions)[1] == info
+
+    # a token from an earlier episode is rejected before any state changes
+    for record in [False, True]:
+        env = MAPFEnv(instance, motion="8", record=record)
+        env.reset()
+        env.step(np.zeros(20, dtype=int))
+        token = env.snapshot()
+        env.reset()
+        pos = env.pos.copy()
+        occupancy = env.occupancy.copy()
+        try:
+            env.restore(token)
+            raise AssertionError("stale snapshot accepted")
+        except ValueError:
+            pass
+        assert env.t == 0
+        assert np.array_equal(env.pos, pos)
+        assert np.array_equal(env.occupancy, occupancy)
+        if record:
+            assert len(env.recorder) == 1
+    print("✓ PASSED\n")
+
+
+def test_step_wrong_action_count():
+    """step() rejects a joint action of the wrong length"""
+    print("=" * 60)
+    print("TEST: step() with wrong number of actions")
+    print("=" * 60)
+
+    env = MAPFEnv(make_random_instance(N=5))
+    env.reset()
+    try:
+        env.step(np.zeros(4, dtype=int))
+    except ValueError as e:
+        print(f"Raised: {e}")
+    else:
+        raise AssertionError("expected ValueError")
+    print("✓ PASSED (correctly failed)\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("RUNNING STRICT TESTS FOR core/env.py")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_step_matches_reference,
+        test_edge_collisions_swaps,
+        test_vec_env_matches_single_envs,
+        test_vec_env_rejects_off_grid_starts,
+        test_zero_copy_states,
+        test_occupancy_tracks_positions,
+        test_trajectory_recording,
+        test_recorded_file_reloads,
+        test_parallel_rollouts,
+        test_legal_action_mask,
+        test_snapshot_restore,
+        test_step_wrong_action_count,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ FAILED: {e}\n")
+            failed += 1
+        except Exception as e:
+            print(f"✗ ERROR: {e}\n")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("=" * 60)
+    print(f"TEST SUMMARY: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Tests for core/grid.py (bit-packed grids)
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.env import MAPFEnv
+from core.grid import PackedGrid, attach_grid, share_grid
+from core.instance import MAPFInstance, instance_from_scen
+from core.rollout import run_rollouts
+from core.validate import validate_paths
+from core.vec_env import VecMAPFEnv
+
+
+def random_grid(H=23, W=17, obstacle_p=0.3, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.random((H, W)) < obstacle_p).astype(np.int8)
+
+
+def random_walk(grid, T=40, N=15, seed=0):
+    """Random-walk paths that sometimes step into walls or off the grid."""
+    rng = np.random.default_rng(seed)
+    H, W = grid.shape
+    deltas = np.array([(0, 0), (0, 1), (1, 0), (-1, 0), (0, -1)])
+    paths = np.zeros((T, N, 2), dtype=np.int64)
+    paths[0] = np.stack([rng.integers(0, H, N), rng.integers(0, W, N)], axis=1)
+    for t in range(1, T):
+        paths[t] = paths[t - 1] + deltas[rng.integers(0, len(deltas), N)]
+    return paths
+
+
+def test_packed_matches_dense():
+    """Point lookups, dense views and operators agree with the int8 grid"""
+    print("=" * 60)
+    print("TEST: PackedGrid matches dense grid")
+    print("=" * 60)
+
+    rng = np.random.default_rng(0)
+    for seed, (H, W) in enumerate([(1, 1), (3, 5), (23, 17), (64, 64)]):
+        grid = random_grid(H, W, seed=seed)
+        packed = PackedGrid.from_dense(grid)
+        assert packed.shape == (H, W) and packed.ndim == 2 and len(packed) == H
+        assert packed.nbytes == (H * W + 7) // 8
+
+        dense = np.asarray(packed)
+        assert dense.dtype == np.int8 and np.array_equal(dense, grid)
+        assert np.array_equal(packed.unpack(), grid)
+        assert np.array_equal(packed == 0, grid == 0)
+        assert np.array_equal(np.argwhere(packed == 0), np.argwhere(grid == 0))
+        assert np.array_equal(packed[1:], grid[1:])
+
+        rows = rng.integers(-H, H, 50)
+        cols = rng.integers(-W, W, 50)
+        assert np.array_equal(packed[rows, cols], grid[rows, cols])
+        assert packed[0, -1] == grid[0, -1]
+
+        rows = rng.integers(-2, H + 2, 50)
+        cols = rng.integers(-2, W + 2, 50)
+        inside = (rows >= 0) & (rows < H) & (cols >= 0) & (cols < W)
+        expected = np.ones(50, dtype=bool)
+        expected[inside] = grid[rows[inside], cols[inside]] == 1
+        assert np.array_equal(packed.is_blocked(rows, cols), expected)
+
+    try:
+        packed[H, 0]
+        raise AssertionError("out-of-bounds index accepted")
+    except IndexError:
+        pass
+    print("✓ PASSED\n")
+
+
+def test_env_and_samplers_accept_packed():
+    """MAPFEnv and instance sampling behave the same on a packed grid"""
+    print("=" * 60)
+    print("TEST: env and instance sampling with PackedGrid")
+    print("=" * 60)
+
+    grid = random_grid(seed=1)
+    packed = PackedGrid.from_dense(grid)
+    free = np.argwhere(grid == 0)
+    rng = np.random.default_rng(1)
+    idx = rng.choice(len(free), size=40, replace=False)
+
+    dense_inst = instance_from_scen(grid, free[idx[:20]], free[idx[20:]], k=12, offset=3)
+    packed_inst = instance_from_scen(packed, free[idx[:20]], free[idx[20:]], k=12, offset=3)
+    assert packed_inst.grid is packed
+
+    bad = MAPFInstance(
+        grid=packed, starts=np.argwhere(grid == 1)[:1], goals=free[:1], num_agents=1
+    )
+    assert not bad.sanity_check(strict=False)
+
+    for motion in ("4", "8"):
+        dense_env = MAPFEnv(dense_inst, motion=motion)
+        packed_env = MAPFEnv(packed_inst, motion=motion)
+        assert packed_env._action_mask is None  # moves read the packed bits
+        dense_env.reset()
+        packed_env.reset()
+        for _ in range(30):
+            actions = rng.integers(0, 9 if motion == "8" else 5, size=12)
+            a, info_a = dense_env.step(actions)
+            b, info_b = packed_env.step(actions)
+            assert np.array_equal(a.pos, b.pos)
+            assert info_a["invalid_moves"] == info_b["invalid_moves"]
+            assert info_a["vertex_collisions"] == info_b["vertex_collisions"]
+
+    dense_venv = VecMAPFEnv([dense_inst], num_envs=3, motion="8")
+    packed_venv = VecMAPFEnv([packed_inst], num_envs=3, motion="8")
+    assert np.array_equal(dense_venv.reset(), packed_venv.reset())
+    for _ in range(20):
+        actions = rng.integers(0, 9, size=(3, 12))
+        a, info_a = dense_venv.step(actions)
+        b, info_b = packed_venv.step(actions)
+        assert np.array_equal(a, b)
+        assert np.array_equal(info_a["invalid_moves"], info_b["invalid_moves"])
+    print("✓ PASSED\n")
+
+
+def test_validator_accepts_packed():
+    """validate_paths gives identical results for packed and dense grids"""
+    print("=" * 60)
+    print("TEST: validate_paths with PackedGrid")
+    print("=" * 60)
+
+    for seed in range(5):
+        grid = random_grid(seed=seed)
+        packed = PackedGrid.from_dense(grid)
+        paths = random_walk(grid, seed=seed)
+        goals = paths[-1]
+        expected = validate_paths(grid, paths, goals=goals, return_conflicts=True)
+        for kwargs in ({}, {"chunk_size": 7}, {"num_workers": 2}):
+            result = validate_paths(
+                packed, paths, goals=goals, return_conflicts=True, **kwargs
+            )
+            conflicts = result.pop("conflicts")
+            assert np.array_equal(conflicts, expected["conflicts"])
+            assert result == {k: v for k, v in expected.items() if k != "conflicts"}
+    print("✓ PASSED\n")
+
+
+def test_shared_packed_grid():
+    """Packed grids go through shared memory packed; pool rollouts agree"""
+    print("=" * 60)
+    print("TEST: PackedGrid in shared memory and run_rollouts")
+    print("=" * 60)
+
+    grid = random_grid(seed=2)
+    packed = PackedGrid.from_dense(grid)
+    shm, spec = share_grid(packed)
+    try:
+        assert spec["shape"] == packed.bits.shape
+        view_shm, view = attach_grid(spec)
+        assert isinstance(view, PackedGrid) and np.array_equal(view, grid)
+        del view
+        view_shm.close()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    free = np.argwhere(grid == 0)
+    rng = np.random.default_rng(2)
+    instances = []
+    for _ in range(4):
+        idx = rng.choice(len(free), size=20, replace=False)
+        instances.append(
+            MAPFInstance(grid=packed, starts=free[idx[:10]], goals=free[idx[10:]], num_agents=10)
+        )
+    dense_instances = [
+        MAPFInstance(grid=grid, starts=i.starts, goals=i.goals, num_agents=10)
+        for i in instances
+    ]
+
+    expected = run_rollouts(dense_instances, steps=30, num_workers=0, seed=5)
+    parallel = run_rollouts(instances, steps=30, num_workers=2, seed=5)
+    for a, b in zip(expected, parallel):
+        assert np.array_equal(a.paths, b.paths)
+        assert a.num_vertex_collisions == b.num_vertex_collisions
+        assert a.num_edge_collisions == b.num_edge_collisions
+        assert a.num_invalid_moves == b.num_invalid_moves
+    print("✓ PASSED\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("RUNNING TESTS FOR core/grid.py")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_packed_matches_dense,
+        test_env_and_samplers_accept_packed,
+        test_validator_accepts_packed,
+        test_shared_packed_grid,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ FAILED: {e}\n")
+            failed += 1
+        except Exception as e:
+            print(f"✗ ERROR: {e}\n")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("=" * 60)
+    print(f"TEST SUMMARY: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Tests for mapf_env/io (map and scenario loading)
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mapf_env.io.cache import cached_load_map, cached_load_scen
+from mapf_env.io.movingai_map import PathLike, load_map
+from mapf_env.io.movingai_scene import load_scen, load_scen_table
+from mapf_env.io.registry import MapRegistry
+
+
+# Original text-mode parser, kept verbatim as the semantic reference.
+def reference_load_map(path: PathLike) -> np.ndarray:
+    path = Path(path)
+
+    with path.open("r") as f:
+        first = f.readline().strip()
+
+        if first.startswith("type"):
+            height_line = f.readline().strip()
+            width_line = f.readline().strip()
+            map_line = f.readline().strip()
+            assert map_line.lower().startswith("map")
+
+            height = int(height_line.split()[1])
+            width = int(width_line.split()[1])
+
+            rows = []
+            for _ in range(height):
+                line = f.readline()
+                if not line:
+                    break
+                # Strip newline and ensure consistent width
+                line_stripped = line.rstrip('\n\r')
+                # Pad or truncate to expected width
+                if len(line_stripped) < width:
+                    line_stripped = line_stripped.ljust(width, '@')  # Pad with obstacles
+                elif len(line_stripped) > width:
+                    line_stripped = line_stripped[:width]  # Truncate
+                rows.append(list(line_stripped))
+            
+            # If we read fewer rows than expected, pad with obstacles
+            while len(rows) < height:
+                rows.append(['@'] * width)
+        else:
+            rows = [list(first)]
+            for line in f:
+                rows.append(list(line.rstrip()))
+            height = len(rows)
+            width = len(rows[0]) if height > 0 else 0
+
+    grid_chars = np.array(rows, dtype="U1")
+    assert grid_chars.shape == (height, width)
+
+    grid = np.zeros(grid_chars.shape, dtype=np.int8)
+
+    free_mask = (grid_chars == ".")
+    obstacle_mask = (grid_chars == "@") | (grid_chars == "T")
+
+    unknown_mask = ~(free_mask | obstacle_mask)
+
+    grid[free_mask] = 0
+    grid[obstacle_mask | unknown_mask] = 1
+
+    return grid
+
+
+# Original line-by-line scen parser, kept verbatim as the semantic reference.
+def reference_load_scen(path: PathLike):
+    path = Path(path)
+
+    start_locations = []
+    goal_locations = []
+
+    with path.open("r") as f:
+        for line in f:
+            line = line.rstrip()
+            if not line or line.startswith("version"):
+                continue
+
+            tokens = line.split("\t")
+            # Expected format: 9 fields per MovingAI scen line
+            assert len(tokens) == 9, f"Unexpected scen format in line: {line}"
+
+            # tokens[4:] are: start_col, start_row, goal_col, goal_row, distance
+            start_col = int(tokens[4])
+            start_row = int(tokens[5])
+            goal_col = int(tokens[6])
+            goal_row = int(tokens[7])
+
+            start_locations.append((start_row, start_col))
+            goal_locations.append((goal_row, goal_col))
+
+    starts = np.array(start_locations, dtype=int)
+    goals = np.array(goal_locations, dtype=int)
+
+    return starts, goals
+
+
+def random_map_text(rng, header=True):
+    """Map text with ragged rows, stray characters and mixed line endings."""
+    H, W = rng.integers(1, 12), rng.integers(1, 12)
+    alphabet = np.array(list(".@T.S "))
+    rows = []
+    for _ in range(H + rng.integers(-2, 3) if header else H):
+        width = W + (rng.integers(-3, 4) if header else 0)
+        chars = alphabet if header else alphabet[:5]
+        rows.append("".join(rng.choice(chars, size=max(width, 0))))
+    if not header:
+        rows = [r.rstrip() or "." for r in rows]
+        rows = [r.ljust(W, ".")[:W] for r in rows]
+    newline = ["\n", "\r\n", "\r"][rng.integers(0, 3)]
+    lines = ["type octile", f"height {H}", f"width {W}", "map"] if header else []
+    text = newline.join(lines + rows)
+    if rng.random() < 0.5:
+        text += newline
+    return text
+
+
+def test_load_map_matches_reference():
+    """Byte-level load_map matches the original parser, padding included"""
+    print("=" * 60)
+    print("TEST: load_map matches text-mode reference")
+    print("=" * 60)
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "m.map"
+        for trial in range(200):
+            path.write_bytes(random_map_text(rng, header=trial % 4 != 0).encode())
+            expected = reference_load_map(path)
+            grid = load_map(path)
+            assert grid.dtype == np.int8
+            assert np.array_equal(grid, expected), (trial, path.read_bytes())
+    print("✓ PASSED\n")
+
+
+def test_cache_roundtrip_and_invalidation():
+    """Cached loads match the parsers, come back memory-mapped, and follow edits"""
+    print("=" * 60)
+    print("TEST: on-disk map/scen cache")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        cache = root / "cache"
+        map_path = root / "m.map"
+        scen_path = root / "m-random-1.scen"
+        map_path.write_text("type octile\nheight 2\nwidth 3\nmap\n.@.\n...\n")
+        scen_path.write_text(
+            "version 1\n"
+            "0\tm.map\t3\t2\t0\t0\t2\t1\t3\n"
+            "0\tm.map\t3\t2\t2\t0\t0\t1\t3\n"
+        )
+
+        for _ in range(2):  # miss, then hit
+            grid = cached_load_map(map_path, cache)
+            assert isinstance(grid, np.memmap) and not grid.flags.writeable
+            assert np.array_equal(grid, load_map(map_path))
+            starts, goals = cached_load_scen(scen_path, cache)
+            expected_starts, expected_goals = load_scen(scen_path)
+            assert np.array_equal(starts, expected_starts)
+            assert np.array_equal(goals, expected_goals)
+        assert len(list(cache.glob("*.npy"))) == 2
+
+        # a changed source gets a new entry instead of the stale grid
+        map_path.write_text("type octile\nheight 2\nwidth 3\nmap\n...\n@@.\n")
+        os.utime(map_path, ns=(0, 10**9))
+        assert np.array_equal(cached_load_map(map_path, cache), load_map(map_path))
+        assert len(list(cache.glob("*.map.npy"))) == 2
+
+        # MAPF_CACHE_DIR="" turns caching off
+        old = os.environ.get("MAPF_CACHE_DIR")
+        os.environ["MAPF_CACHE_DIR"] = ""
+        try:
+            grid = cached_load_map(map_path)
+            assert not isinstance(grid, np.memmap)
+        finally:
+            if old is None:
+                del os.environ["MAPF_CACHE_DIR"]
+            else:
+                os.environ["MAPF_CACHE_DIR"] = old
+    print("✓ PASSED\n")
+
+
+def test_scen_table_matches_reference():
+    """load_scen_table keeps every column; load_scen matches the old parser"""
+    print("=" * 60)
+    print("TEST: vectorized scen parsing")
+    print("=" * 60)
+
+    rng = np.random.default_rng(0)
+    M = 500
+    cols = rng.integers(0, 256, size=(M, 4))
+    dist = rng.random(M) * 300
+    lines = ["version 1"] + [
+        f"{i // 10}\tmaze-256-256.map\t256\t256\t"
+        + "\t".join(str(v) for v in cols[i])
+        + f"\t{dist[i]:.8f}"
+        for i in range(M)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "m-random-1.scen"
+        path.write_text("\n".join(lines) + "\n")
+
+        table = load_scen_table(path)
+        assert table.shape == (M,)
+        assert np.array_equal(table["bucket"], np.arange(M) // 10)
+        assert np.all(table["map"] == "maze-256-256.map")
+        assert np.all(table["width"] == 256) and np.all(table["height"] == 256)
+        assert np.array_equal(table["start_col"], cols[:, 0])
+        assert np.array_equal(table["goal_row"], cols[:, 3])
+        assert np.allclose(table["optimal_length"], dist)
+
+        starts, goals = load_scen(path)
+        expected_starts, expected_goals = reference_load_scen(path)
+        assert starts.dtype == expected_starts.dtype
+        assert np.array_equal(starts, expected_starts)
+        assert np.array_equal(goals, expected_goals)
+
+        # one row still comes back 2-D; a header-only file is empty
+        path.write_text(lines[0] + "\n" + lines[1] + "\n")
+        assert load_scen(path)[0].shape == (1, 2)
+        path.write_text("version 1\n")
+        assert load_scen(path)[0].shape == (0, 2)
+
+        # "version" inside a line is data; long map names are kept whole
+        long_name = "conversion-" + "x" * 80 + ".map"
+        path.write_text(
+            "version 1\n\n"
+            "0\tconversion.map\t3\t2\t0\t0\t2\t1\t3\n"
+            f"1\t{long_name}\t3\t2\t2\t0\t0\t1\t3\n"
+        )
+        table = load_scen_table(path)
+        assert list(table["map"]) == ["conversion.map", long_name]
+        assert np.array_equal(load_scen(path)[0], reference_load_scen(path)[0])
+
+        # whitespace-only lines are skipped and trailing tabs are ignored
+        path.write_text(
+            "version 1\n \t\n"
+            "0\tm.map\t3\t2\t0\t0\t2\t1\t5.5\t\n"
+            "   \n"
+            "1\tm.map\t3\t2\t2\t0\t0\t1\t3\r\n"
+        )
+        table = load_scen_table(path)
+        assert table.shape == (2,) and np.allclose(table["optimal_length"], [5.5, 3])
+        assert np.array_equal(load_scen(path)[0], reference_load_scen(path)[0])
+        assert np.array_equal(load_scen(path)[1], reference_load_scen(path)[1])
+
+        path.write_text("version 1\n0\tm.map\t3\n")
+        try:
+            load_scen(path)
+            raise AssertionError("short line accepted")
+        except ValueError:
+            pass
+    print("✓ PASSED\n")
+
+
+def test_map_registry():
+    """MapRegistry indexes maps/scens once, persists it, and rescans on changes"""
+    print("=" * 60)
+    print("TEST: MapRegistry index and grid LRU")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        old = os.environ.get("MAPF_CACHE_DIR")
+        os.environ["MAPF_CACHE_DIR"] = str(root / "cache")
+        try:
+            maps_dir, scen_dir = root / "maps", root / "scens"
+            maps_dir.mkdir()
+            scen_dir.mkdir()
+            index_path = root / "index.json"
+            (maps_dir / "a.map").write_text("type octile\nheight 2\nwidth 3\nmap\n.@.\n...\n")
+            (maps_dir / "b-1.map").write_text("type octile\nheight 1\nwidth 2\nmap\n..\n")
+            for i in (10, 2, 1):
+                (scen_dir / f"a-random-{i}.scen").write_text("version 1\n")
+            (scen_dir / "b-1-random-1.scen").write_text("version 1\n")
+
+            registry = MapRegistry(maps_dir, scen_dir, index_path=index_path, cache_size=1)
+            assert registry.names == ["a", "b-1"] and "a" in registry
+            assert [p.name for p in registry.scen_files("a")] == [
+                "a-random-1.scen", "a-random-2.scen", "a-random-10.scen",
+            ]
+            assert registry.scen_path("b-1") == scen_dir / "b-1-random-1.scen"
+            assert registry.scen_path("missing") is None
+            assert registry.shape("a") == (2, 3) and registry.num_free("a") == 5
+            assert registry.shape("b-1") == (1, 2) and registry.num_free("b-1") == 2
+
+            grid = registry.grid("a")
+            assert np.array_equal(grid, load_map(maps_dir / "a.map"))
+            assert registry.grid("a") is grid  # LRU hit
+            registry.grid("b-1")
+            assert registry.grid("a") is not grid  # evicted at cache_size=1
+            try:
+                registry.grid("missing")
+                raise AssertionError("unknown map accepted")
+            except ValueError:
+                pass
+
+            # a second registry reads the persisted index instead of rescanning
+            assert index_path.exists()
+            index_path.write_text(index_path.read_text().replace('"num_free": 5', '"num_free": 99'))
+            assert MapRegistry(maps_dir, scen_dir, index_path=index_path).num_free("a") == 99
+
+            # adding files changes the directory mtimes and triggers a rescan
+            (maps_dir / "c.map").write_text("..\n..\n")
+            (scen_dir / "c-random-1.scen").write_text("version 1\n")
+            os.utime(maps_dir, ns=(0, 10**9))
+            os.utime(scen_dir, ns=(0, 10**9))
+            registry = MapRegistry(maps_dir, scen_dir, index_path=index_path)
+            assert registry.names == ["a", "b-1", "c"]
+            assert registry.num_free("a") == 99  # unchanged map reused from the index
+            assert registry.shape("c") == (2, 2)
+            assert registry.scen_path("c") == scen_dir / "c-random-1.scen"
+        finally:
+            if old is None:
+                del os.environ["MAPF_CACHE_DIR"]
+            else:
+                os.environ["MAPF_CACHE_DIR"] = old
+    print("✓ PASSED\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("RUNNING TESTS FOR mapf_env/io")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_load_map_matches_reference,
+        test_scen_table_matches_reference,
+        test_cache_roundtrip_and_invalidation,
+        test_map_registry,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ FAILED: {e}\n")
+            failed += 1
+        except Exception as e:
+            print(f"✗ ERROR: {e}\n")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("=" * 60)
+    print(f"TEST SUMMARY: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests for core/metrics.py (solution-quality metrics)
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.actions import decode_actions
+from core.metrics import (
+    action_arrival_times,
+    action_solution_metrics,
+    arrival_times,
+    solution_metrics,
+)
+
+
+def reference_arrival(paths, goals):
+    """Per-agent loop: last time the agent steps onto its goal and stays."""
+    T, N, _ = paths.shape
+    arrival = []
+    for i in range(N):
+        t = T - 1
+        if not np.array_equal(paths[t, i], goals[i]):
+            arrival.append(-1)
+            continue
+        while t > 0 and np.array_equal(paths[t - 1, i], goals[i]):
+            t -= 1
+        arrival.append(t)
+    return np.array(arrival)
+
+
+def test_arrival_matches_reference():
+    """Vectorized arrival times agree with a per-agent loop"""
+    print("=" * 60)
+    print("TEST: arrival times match per-agent loop")
+    print("=" * 60)
+
+    rng = np.random.default_rng(0)
+    for seed in range(20):
+        T, N = rng.integers(1, 15), rng.integers(1, 10)
+        # tiny 2x2 world so agents keep leaving and re-entering their goals
+        paths = rng.integers(0, 2, size=(T, N, 2))
+        goals = rng.integers(0, 2, size=(N, 2))
+        expected = reference_arrival(paths, goals)
+        assert np.array_equal(arrival_times(paths, goals), expected), seed
+        for chunk_size in (1, 2, 5):
+            assert np.array_equal(arrival_times(paths, goals, chunk_size), expected)
+
+        metrics = solution_metrics(paths, goals)
+        assert metrics["num_arrived"] == int(np.sum(expected >= 0))
+        if np.all(expected >= 0):
+            assert metrics["sum_of_costs"] == int(expected.sum())
+            assert metrics["makespan"] == int(expected.max())
+        else:
+            assert metrics["sum_of_costs"] is None and metrics["makespan"] is None
+    print("✓ PASSED\n")
+
+
+def test_metrics_example():
+    """Hand-checked sum-of-costs and makespan"""
+    print("=" * 60)
+    print("TEST: sum-of-costs / makespan example")
+    print("=" * 60)
+
+    paths = np.array(
+        [
+            [[0, 0], [1, 1], [2, 2]],
+            [[0, 1], [1, 1], [2, 1]],  # agent 1 leaves its goal ...
+            [[0, 1], [1, 2], [2, 2]],
+            [[0, 1], [1, 1], [2, 2]],  # ... and is back for good at t=3
+        ]
+    )
+    goals = np.array([[0, 1], [1, 1], [2, 2]])
+    metrics = solution_metrics(paths, goals)
+    assert metrics["arrival_times"].tolist() == [1, 3, 2]
+    assert metrics["sum_of_costs"] == 6
+    assert metrics["makespan"] == 3
+
+    metrics = solution_metrics(paths[:3], goals)
+    assert metrics["arrival_times"].tolist() == [1, -1, 2]
+    assert metrics["num_arrived"] == 2
+    assert metrics["sum_of_costs"] is None
+    print("✓ PASSED\n")
+
+
+def test_action_arrival_matches_decoded():
+    """Action-encoded arrival times agree with decoding the path first"""
+    print("=" * 60)
+    print("TEST: arrival times of action-encoded paths")
+    print("=" * 60)
+
+    rng = np.random.default_rng(1)
+    for seed in range(30):
+        T, N = rng.integers(1, 15), rng.integers(1, 10)
+        starts = rng.integers(0, 3, size=(N, 2))
+        # mostly WAITs, so agents sit on (and leave) their goals for a while
+        actions = np.where(rng.random((T - 1, N)) < 0.6, 0, rng.integers(1, 9, (T - 1, N)))
+        actions = actions.astype(np.uint8)
+        paths = decode_actions(starts, actions)
+        goals = paths[-1].copy()
+        goals[rng.random(N) < 0.3] += 1
+        expected = reference_arrival(paths, goals)
+        for chunk_size in (None, 1, 3):
+            got = action_arrival_times(starts, actions, goals, chunk_size)
+            assert np.array_equal(got, expected), seed
+        metrics = action_solution_metrics(starts, actions, goals)
+        expected_metrics = solution_metrics(paths, goals)
+        assert np.array_equal(metrics.pop("arrival_times"), expected_metrics.pop("arrival_times"))
+        assert metrics == expected_metrics
+    print("✓ PASSED\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("RUNNING TESTS FOR core/metrics.py")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_arrival_matches_reference,
+        test_metrics_example,
+        test_action_arrival_matches_decoded,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ FAILED: {e}\n")
+            failed += 1
+        except Exception as e:
+            print(f"✗ ERROR: {e}\n")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("=" * 60)
+    print(f"TEST SUMMARY: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Tests for scripts/validate_batch.py
+"""
+
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.validate import validate_paths
+from mapf_env.io.movingai_map import load_map
+
+
+def write_fixture(root: Path):
+    """A 4x5 map, a 3-agent scen and three paths files (one is invalid)."""
+    maps_dir = root / "maps"
+    scen_dir = root / "scens"
+    runs_dir = root / "runs"
+    for d in (maps_dir, scen_dir, runs_dir, runs_dir / "bad"):
+        d.mkdir()
+
+    (maps_dir / "tiny.map").write_text(
+        "type octile\nheight 4\nwidth 5\nmap\n.....\n.@...\n.....\n.....\n"
+    )
+    scen_rows = [(0, 0, 0, 2), (3, 0, 3, 2), (2, 4, 2, 4)]  # (sr, sc, gr, gc)
+    lines = ["version 1"]
+    for sr, sc, gr, gc in scen_rows:
+        lines.append("\t".join(map(str, [0, "tiny.map", 5, 4, sc, sr, gc, gr, 2])))
+    (scen_dir / "tiny-random-1.scen").write_text("\n".join(lines) + "\n")
+
+    good = np.array(
+        [
+            [[0, 0], [3, 0], [2, 4]],
+            [[0, 1], [3, 1], [2, 4]],
+            [[0, 2], [3, 2], [2, 4]],
+        ]
+    )
+    bad = good.copy()
+    bad[2, 1] = [2, 4]  # agent 1 jumps onto agent 2: illegal move + vertex
+    np.save(runs_dir / "tiny_paths.npy", good)
+    np.save(runs_dir / "bad" / "tiny_paths.npy", bad)
+    np.save(runs_dir / "unnamed.npy", good)
+    return maps_dir, scen_dir, runs_dir, good, bad
+
+
+def run_batch(args, cwd, cache_dir):
+    return subprocess.run(
+        [sys.executable, "-m", "scripts.validate_batch", *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "MAPF_CACHE_DIR": str(cache_dir)},
+    )
+
+
+def test_batch_csv_and_jsonl():
+    """Batch mode validates every file once and writes one row per file"""
+    print("=" * 60)
+    print("TEST: Batch validation to CSV and JSONL")
+    print("=" * 60)
+
+    repo = Path(__file__).parent.parent
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        maps_dir, scen_dir, runs_dir, good, bad = write_fixture(root)
+        common = ["--maps_dir", str(maps_dir), "--scen_dir", str(scen_dir)]
+
+        out_csv = root / "results.csv"
+        result = run_batch(
+            [
+                str(runs_dir),
+                str(runs_dir / "bad"),
+                *common,
+                "--num_workers",
+                "2",
+                "--out",
+                str(out_csv),
+            ],
+            repo,
+            root / "cache",
+        )
+        print(result.stdout)
+        assert result.returncode == 0, result.stderr
+        with out_csv.open() as f:
+            rows = {
+                Path(r["file"]).relative_to(runs_dir).as_posix(): r
+                for r in csv.DictReader(f)
+            }
+
+        assert list(rows) == ["tiny_paths.npy", "unnamed.npy", "bad/tiny_paths.npy"]
+        assert rows["tiny_paths.npy"]["ok"] == "True"
+        assert rows["tiny_paths.npy"]["success"] == "True"
+        assert rows["tiny_paths.npy"]["sum_of_costs"] == "4"
+        assert rows["tiny_paths.npy"]["makespan"] == "2"
+        assert rows["bad/tiny_paths.npy"]["ok"] == "False"
+        assert rows["bad/tiny_paths.npy"]["first_error_type"] == "illegal_move"
+        assert "Cannot infer map name" in rows["unnamed.npy"]["error"]
+
+        # same counts as validating the file directly
+        grid = load_map(maps_dir / "tiny.map")
+        expected = validate_paths(grid, bad)
+        for key in ("num_illegal_moves", "num_vertex_collisions", "num_edge_collisions"):
+            assert int(rows["bad/tiny_paths.npy"][key]) == expected[key]
+
+        out_jsonl = root / "results.jsonl"
+        result = run_batch(
+            [
+                str(runs_dir / "*" / "*_paths.npy"),
+                str(runs_dir / "*_paths.npy"),
+                *common,
+                "--map",
+                "tiny",
+                "--num_workers",
+                "0",
+                "--out",
+                str(out_jsonl),
+            ],
+            repo,
+            root / "cache",
+        )
+        assert result.returncode == 0, result.stderr
+        rows = [json.loads(line) for line in out_jsonl.read_text().splitlines()]
+        assert [Path(r["file"]).relative_to(runs_dir).as_posix() for r in rows] == [
+            "bad/tiny_paths.npy",
+            "tiny_paths.npy",
+        ]
+        assert rows[0]["num_vertex_collisions"] == 1
+        assert rows[1]["ok"] is True and rows[1]["T"] == 3 and rows[1]["N"] == 3
+        assert all(r["seconds"] >= 0 for r in rows)
+    print("✓ PASSED\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("RUNNING TESTS FOR scripts/validate_batch.py")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_batch_csv_and_jsonl,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ FAILED: {e}\n")
+            failed += 1
+        except Exception as e:
+            print(f"✗ ERROR: {e}\n")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("=" * 60)
+    print(f"TEST SUMMARY: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
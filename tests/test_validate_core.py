@@ -0,0 +1,613 @@
+#!/usr/bin/env python3
+"""
+Strict tests for core/validate.py (validate_paths)
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.actions import decode_actions, encode_actions, load_actions, save_actions
+from core.validate import (
+    CONFLICT_TYPES,
+    Connectivity,
+    IncrementalValidator,
+    _allowed_deltas,
+    _edge_collisions,
+    validate_actions,
+    validate_paths,
+    validate_paths_file,
+)
+
+
+# Original loop-based validator, kept verbatim as the semantic reference.
+def reference_validate(
+    grid: np.ndarray,
+    paths: np.ndarray,
+    *,
+    starts: Optional[np.ndarray] = None,
+    goals: Optional[np.ndarray] = None,
+    connectivity: Connectivity = "4",
+) -> Dict[str, Any]:
+    if paths.ndim != 3 or paths.shape[2] != 2:
+        raise ValueError(f"paths must have shape (T, N, 2); got {paths.shape}")
+
+    H, W = grid.shape
+    T, N, _ = paths.shape
+
+    allowed = _allowed_deltas(connectivity)
+
+    num_vertex_collisions = 0
+    num_edge_collisions = 0
+    num_illegal_moves = 0
+    num_out_of_bounds = 0
+    num_on_obstacle = 0
+
+    first_error: Optional[Dict[str, Any]] = None
+
+    # --- per-timestep position validity ---
+    for t in range(T):
+        pos_t = paths[t]  # shape (N, 2)
+        rows = pos_t[:, 0]
+        cols = pos_t[:, 1]
+
+        # bounds
+        oob_mask = (rows < 0) | (rows >= H) | (cols < 0) | (cols >= W)
+        if np.any(oob_mask):
+            idxs = np.where(oob_mask)[0]
+            num_out_of_bounds += int(len(idxs))
+            if first_error is None:
+                first_error = {
+                    "time": t,
+                    "type": "bounds",
+                    "agents": tuple(int(i) for i in idxs[:4]),
+                    "extra": {
+                        "positions": [tuple(map(int, pos_t[i])) for i in idxs[:4]]
+                    },
+                }
+
+        # obstacle
+        in_bounds_idxs = np.where(~oob_mask)[0]
+        if len(in_bounds_idxs) > 0:
+            r_in = rows[in_bounds_idxs]
+            c_in = cols[in_bounds_idxs]
+            blocked_mask = grid[r_in, c_in] == 1
+            if np.any(blocked_mask):
+                bad_local = np.where(blocked_mask)[0]
+                bad_idxs = in_bounds_idxs[bad_local]
+                num_on_obstacle += int(len(bad_idxs))
+                if first_error is None:
+                    first_error = {
+                        "time": t,
+                        "type": "obstacle",
+                        "agents": tuple(int(i) for i in bad_idxs[:4]),
+                        "extra": {
+                            "positions": [tuple(map(int, pos_t[i])) for i in bad_idxs[:4]]
+                        },
+                    }
+
+    # --- move legality (neighbor or wait) ---
+    for t in range(1, T):
+        prev = paths[t - 1]
+        curr = paths[t]
+        deltas = curr - prev  # (N, 2)
+        for i in range(N):
+            dr, dc = int(deltas[i, 0]), int(deltas[i, 1])
+            if (dr, dc) not in allowed:
+                num_illegal_moves += 1
+                if first_error is None:
+                    first_error = {
+                        "time": t,
+                        "type": "illegal_move",
+                        "agents": (int(i),),
+                        "extra": {"delta": (dr, dc)},
+                    }
+
+    # --- vertex collisions ---
+    for t in range(T):
+        pos_t = paths[t]
+        # map cell -> list of agents
+        cell_to_agents: Dict[Tuple[int, int], list] = {}
+        for i in range(N):
+            cell = (int(pos_t[i, 0]), int(pos_t[i, 1]))
+            cell_to_agents.setdefault(cell, []).append(i)
+
+        for cell, agents in cell_to_agents.items():
+            if len(agents) > 1:
+                # count number of unordered pairs
+                k = len(agents)
+                num_vertex_collisions += k * (k - 1) // 2
+                if first_error is None:
+                    first_error = {
+                        "time": t,
+                        "type": "vertex_collision",
+                        "agents": tuple(int(a) for a in agents),
+                        "extra": {"cell": cell},
+                    }
+
+    # --- edge collisions (swaps) ---
+    for t in range(1, T):
+        prev = paths[t - 1]
+        curr = paths[t]
+        for i in range(N):
+            for j in range(i + 1, N):
+                if (
+                    prev[i, 0] == curr[j, 0]
+                    and prev[i, 1] == curr[j, 1]
+                    and prev[j, 0] == curr[i, 0]
+                    and prev[j, 1] == curr[i, 1]
+                ):
+                    num_edge_collisions += 1
+                    if first_error is None:
+                        first_error = {
+                            "time": t,
+                            "type": "edge_collision",
+                            "agents": (int(i), int(j)),
+                            "extra": {
+                                "from_to_i": (
+                                    int(prev[i, 0]),
+                                    int(prev[i, 1]),
+                                    int(curr[i, 0]),
+                                    int(curr[i, 1]),
+                                ),
+                                "from_to_j": (
+                                    int(prev[j, 0]),
+                                    int(prev[j, 1]),
+                                    int(curr[j, 0]),
+                                    int(curr[j, 1]),
+                                ),
+                            },
+                        }
+
+    # --- success flag (if goals provided) ---
+    if goals is not None:
+        if goals.shape != (paths.shape[1], 2):
+            raise ValueError(
+                f"goals must have shape (N, 2); got {goals.shape}, N={paths.shape[1]}"
+            )
+        final_pos = paths[-1]
+        success = bool(np.all(final_pos == goals))
+    else:
+        success = None
+
+    ok = (
+        num_out_of_bounds == 0
+        and num_on_obstacle == 0
+        and num_illegal_moves == 0
+        and num_vertex_collisions == 0
+        and num_edge_collisions == 0
+        and (success is not False)
+    )
+
+    return {
+        "ok": ok,
+        "first_error": first_error,
+        "num_vertex_collisions": int(num_vertex_collisions),
+        "num_edge_collisions": int(num_edge_collisions),
+        "num_illegal_moves": int(num_illegal_moves),
+        "num_out_of_bounds": int(num_out_of_bounds),
+        "num_on_obstacle": int(num_on_obstacle),
+        "success": success,
+    }
+
+
+def make_paths(T=30, N=12, H=8, W=9, seed=0, noise=0.1, obstacle_p=0.15, margin=2):
+    """Random-walk paths with a sprinkle of teleports (off-grid if margin > 0)."""
+    rng = np.random.default_rng(seed)
+    grid = (rng.random((H, W)) < obstacle_p).astype(np.int8)
+    deltas = np.array([(0, 0), (0, 1), (1, 0), (-1, 0), (0, -1), (1, 1), (-1, -1)])
+    paths = np.zeros((T, N, 2), dtype=np.int64)
+    paths[0] = np.stack([rng.integers(0, H, N), rng.integers(0, W, N)], axis=1)
+    for t in range(1, T):
+        step = deltas[rng.integers(0, len(deltas), N)]
+        paths[t] = np.clip(paths[t - 1] + step, 0, [H - 1, W - 1])
+        jump = rng.random(N) < noise
+        paths[t, jump] = np.stack(
+            [
+                rng.integers(-margin, H + margin, jump.sum()),
+                rng.integers(-margin, W + margin, jump.sum()),
+            ],
+            axis=1,
+        )
+    goals = paths[-1].copy()
+    goals[rng.random(N) < 0.2] += 1
+    return grid, paths, goals
+
+
+def test_matches_reference():
+    """validate_paths agrees with the loop reference on random inputs"""
+    print("=" * 60)
+    print("TEST: validate_paths matches loop reference")
+    print("=" * 60)
+
+    for seed in range(60):
+        noise = [0.0, 0.02, 0.1][seed % 3]
+        obstacle_p = [0.0, 0.15][seed % 2]
+        margin = [0, 2][(seed // 2) % 2]
+        grid, paths, goals = make_paths(
+            seed=seed, noise=noise, obstacle_p=obstacle_p, margin=margin
+        )
+        for connectivity in ["4", "8"]:
+            expected = reference_validate(
+                grid, paths, goals=goals, connectivity=connectivity
+            )
+            result = validate_paths(grid, paths, goals=goals, connectivity=connectivity)
+            assert result == expected, (seed, connectivity, result, expected)
+    print("✓ PASSED\n")
+
+
+def test_swap_pass_matches_brute_force():
+    """Sort-based swap counting agrees with the pairwise loop on crowded paths"""
+    print("=" * 60)
+    print("TEST: swap pass matches brute force")
+    print("=" * 60)
+
+    for seed in range(20):
+        # many agents on a tiny grid: plenty of swaps and shared waits
+        grid, paths, _ = make_paths(
+            T=15, N=25, H=3, W=3, seed=seed, noise=0.05, margin=seed % 2
+        )
+        T, N, _ = paths.shape
+        expected, first = 0, None
+        for t in range(1, T):
+            for i in range(N):
+                for j in range(i + 1, N):
+                    if np.array_equal(paths[t - 1, i], paths[t, j]) and np.array_equal(
+                        paths[t - 1, j], paths[t, i]
+                    ):
+                        expected += 1
+                        first = first or (t, (i, j))
+
+        count, error = _edge_collisions(paths, grid.shape)
+        assert count == expected, (seed, count, expected)
+        assert (error["time"], error["agents"]) == first, (seed, error, first)
+    print("✓ PASSED\n")
+
+
+def test_chunked_matches_whole():
+    """Windowed validation (in memory and memory-mapped) matches one pass"""
+    print("=" * 60)
+    print("TEST: chunked validation matches whole-tensor validation")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for seed in range(12):
+            grid, paths, goals = make_paths(
+                T=40, N=10, H=4, W=5, seed=seed, noise=[0.0, 0.05][seed % 2]
+            )
+            npy = Path(tmp) / f"paths_{seed}.npy"
+            np.save(npy, paths)
+            for connectivity in ["4", "8"]:
+                expected = validate_paths(
+                    grid, paths, goals=goals, connectivity=connectivity
+                )
+                for chunk_size in [1, 2, 7, 39, 100]:
+                    result = validate_paths(
+                        grid,
+                        paths,
+                        goals=goals,
+                        connectivity=connectivity,
+                        chunk_size=chunk_size,
+                    )
+                    assert result == expected, (seed, chunk_size, result, expected)
+                result = validate_paths_file(
+                    grid, npy, goals=goals, connectivity=connectivity, chunk_size=5
+                )
+                assert result == expected, (seed, result, expected)
+    print("✓ PASSED\n")
+
+
+def test_fail_fast():
+    """fail_fast stops at the earliest violating timestep with prefix counts"""
+    print("=" * 60)
+    print("TEST: fail_fast")
+    print("=" * 60)
+
+    count_keys = [
+        ("bounds", "num_out_of_bounds"),
+        ("obstacle", "num_on_obstacle"),
+        ("illegal_move", "num_illegal_moves"),
+        ("vertex_collision", "num_vertex_collisions"),
+        ("edge_collision", "num_edge_collisions"),
+    ]
+    for seed in range(20):
+        grid, paths, goals = make_paths(
+            T=60, N=6, H=12, W=12, seed=seed, noise=0.01, obstacle_p=0.02
+        )
+        kw = {"connectivity": "48"[seed % 2]}
+        result = validate_paths(
+            grid, paths, goals=goals, fail_fast=True, chunk_size=16, **kw
+        )
+        error = result["first_error"]
+        if error is None:
+            assert result == validate_paths(grid, paths, goals=goals, **kw)
+            continue
+
+        t = error["time"]
+        before = validate_paths(grid, paths[:t], **kw)
+        upto = validate_paths(grid, paths[: t + 1], **kw)
+        for _, key in count_keys:
+            assert result[key] == upto[key], (seed, key, result, upto)
+        new = [kind for kind, key in count_keys if upto[key] > before[key]]
+        assert new and error["type"] == new[0], (seed, error, new)
+        assert all(before[key] == 0 for _, key in count_keys), (seed, before)
+        assert result["ok"] is False
+
+    # a swap at t=1 is reported before a vertex collision at t=2
+    grid = np.zeros((3, 3), dtype=np.int8)
+    paths = np.array(
+        [
+            [[0, 0], [0, 1], [2, 1]],
+            [[0, 1], [0, 0], [2, 0]],
+            [[0, 1], [1, 0], [1, 0]],
+        ]
+    )
+    result = validate_paths(grid, paths, fail_fast=True)
+    assert result["first_error"]["type"] == "edge_collision"
+    assert result["first_error"]["time"] == 1
+    assert result["num_edge_collisions"] == 1
+    assert result["num_vertex_collisions"] == 0
+    print("✓ PASSED\n")
+
+
+def test_parallel_matches_serial():
+    """Time-sharded validation on a process pool matches the serial result"""
+    print("=" * 60)
+    print("TEST: parallel sharded validation matches serial")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for seed in range(3):
+            grid, paths, goals = make_paths(
+                T=120, N=10, H=5, W=5, seed=seed, noise=0.03
+            )
+            npy = Path(tmp) / f"paths_{seed}.npy"
+            np.save(npy, paths)
+            expected = validate_paths(grid, paths, goals=goals, connectivity="8")
+
+            # in-memory input goes through shared memory
+            result = validate_paths(
+                grid, paths, goals=goals, connectivity="8", num_workers=3
+            )
+            assert result == expected, (seed, result, expected)
+
+            # memory-mapped input is mapped by the workers directly
+            result = validate_paths_file(
+                grid, npy, goals=goals, connectivity="8", chunk_size=9, num_workers=4
+            )
+            assert result == expected, (seed, result, expected)
+    print("✓ PASSED\n")
+
+
+def test_incremental_validator():
+    """Feeding rows one at a time reports each step's violations and the batch result"""
+    print("=" * 60)
+    print("TEST: IncrementalValidator")
+    print("=" * 60)
+
+    for seed in range(10):
+        grid, paths, goals = make_paths(T=25, N=8, H=5, W=6, seed=seed, noise=0.05)
+        connectivity = "48"[seed % 2]
+        validator = IncrementalValidator(grid, goals=goals, connectivity=connectivity)
+        before = validate_paths(grid, paths[:0], connectivity=connectivity)
+        for t in range(paths.shape[0]):
+            violations = validator.feed(paths[t])
+            upto = validate_paths(grid, paths[: t + 1], connectivity=connectivity)
+            grew = [
+                key
+                for key in (
+                    "num_out_of_bounds",
+                    "num_on_obstacle",
+                    "num_illegal_moves",
+                    "num_vertex_collisions",
+                    "num_edge_collisions",
+                )
+                if upto[key] > before[key]
+            ]
+            assert len(violations) == len(grew), (seed, t, violations, grew)
+            assert all(v["time"] == t for v in violations)
+            before = upto
+
+        assert validator.t == paths.shape[0]
+        expected = validate_paths(grid, paths, goals=goals, connectivity=connectivity)
+        assert validator.result() == expected, (seed, validator.result(), expected)
+    print("✓ PASSED\n")
+
+
+def test_action_encoding():
+    """Action-encoded paths round-trip and validate like positions"""
+    print("=" * 60)
+    print("TEST: action-encoded paths")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for seed in range(12):
+            # unit moves only (no teleports), so every step has an action id
+            grid, paths, goals = make_paths(T=30, N=10, seed=seed, noise=0.0, margin=0)
+            starts, actions = encode_actions(paths)
+            assert actions.dtype == np.uint8 and actions.shape == (29, 10)
+            assert np.array_equal(decode_actions(starts, actions), paths)
+
+            npz = Path(tmp) / f"actions_{seed}.npz"
+            save_actions(npz, starts, actions)
+            starts2, actions2, motion = load_actions(npz)
+            assert motion == "8"
+            assert np.array_equal(starts2, starts) and np.array_equal(actions2, actions)
+
+            for connectivity in ["4", "8"]:
+                expected = validate_paths(
+                    grid, paths, goals=goals, connectivity=connectivity
+                )
+                for chunk_size in [None, 1, 6]:
+                    result = validate_actions(
+                        grid,
+                        starts,
+                        actions,
+                        goals=goals,
+                        connectivity=connectivity,
+                        chunk_size=chunk_size,
+                    )
+                    assert result == expected, (seed, connectivity, chunk_size, result)
+
+    # teleports and diagonals under "4" have no encoding
+    paths = np.array([[[0, 0]], [[2, 0]]])
+    for bad, motion in [(paths, "8"), (np.array([[[0, 0]], [[1, 1]]]), "4")]:
+        try:
+            encode_actions(bad, motion)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"expected ValueError for {bad.tolist()}")
+    print("✓ PASSED\n")
+
+
+def test_conflict_listing():
+    """return_conflicts lists every violation, matching the counts and a loop"""
+    print("=" * 60)
+    print("TEST: full conflict listing")
+    print("=" * 60)
+
+    code = {kind: k for k, kind in enumerate(CONFLICT_TYPES)}
+    for seed in range(8):
+        grid, paths, _ = make_paths(T=20, N=9, H=4, W=4, seed=seed, noise=0.05)
+        H, W = grid.shape
+        T, N, _ = paths.shape
+        allowed = _allowed_deltas("4")
+
+        expected = []
+        for t in range(T):
+            for i in range(N):
+                r, c = paths[t, i]
+                if not (0 <= r < H and 0 <= c < W):
+                    expected.append((t, code["bounds"], i, -1))
+                elif grid[r, c] == 1:
+                    expected.append((t, code["obstacle"], i, -1))
+                if t > 0 and tuple(paths[t, i] - paths[t - 1, i]) not in allowed:
+                    expected.append((t, code["illegal_move"], i, -1))
+                for j in range(i + 1, N):
+                    if np.array_equal(paths[t, i], paths[t, j]):
+                        expected.append((t, code["vertex_collision"], i, j))
+                    if (
+                        t > 0
+                        and np.array_equal(paths[t - 1, i], paths[t, j])
+                        and np.array_equal(paths[t - 1, j], paths[t, i])
+                    ):
+                        expected.append((t, code["edge_collision"], i, j))
+        expected.sort()
+
+        for chunk_size in [None, 3]:
+            result = validate_paths(
+                grid, paths, chunk_size=chunk_size, return_conflicts=True
+            )
+            conflicts = result["conflicts"]
+            got = [
+                (int(c["time"]), int(c["type"]), int(c["agent_i"]), int(c["agent_j"]))
+                for c in conflicts
+            ]
+            assert got == expected, (seed, chunk_size)
+            t, i = conflicts["time"], conflicts["agent_i"]
+            assert np.array_equal(conflicts["row"], paths[t, i, 0])
+            assert np.array_equal(conflicts["prev_col"], paths[np.maximum(t - 1, 0), i, 1])
+            assert result["num_vertex_collisions"] == np.sum(
+                conflicts["type"] == code["vertex_collision"]
+            )
+
+        # the streaming file entry point lists the same conflicts
+        with tempfile.TemporaryDirectory() as tmp:
+            npy = Path(tmp) / "paths.npy"
+            np.save(npy, paths)
+            result = validate_paths_file(grid, npy, chunk_size=3, return_conflicts=True)
+            assert np.array_equal(result["conflicts"], conflicts)
+    print("✓ PASSED\n")
+
+
+def test_first_error_priority():
+    """first_error follows check order, not time: a later vertex beats an earlier swap"""
+    print("=" * 60)
+    print("TEST: first_error priority")
+    print("=" * 60)
+
+    grid = np.zeros((3, 3), dtype=np.int8)
+    paths = np.array(
+        [
+            [[0, 0], [0, 1], [2, 1]],
+            [[0, 1], [0, 0], [2, 0]],  # agents 0 and 1 swap
+            [[0, 1], [1, 0], [1, 0]],  # agents 1 and 2 meet
+        ]
+    )
+    result = validate_paths(grid, paths)
+    assert result == reference_validate(grid, paths)
+    assert result["num_edge_collisions"] == 1
+    assert result["num_vertex_collisions"] == 1
+    assert result["first_error"]["type"] == "vertex_collision"
+    assert result["first_error"]["time"] == 2
+    assert result["first_error"]["agents"] == (1, 2)
+    print("✓ PASSED\n")
+
+
+def test_clean_paths_ok():
+    """Non-colliding paths that reach their goals validate as ok"""
+    print("=" * 60)
+    print("TEST: clean paths are ok")
+    print("=" * 60)
+
+    grid = np.zeros((5, 5), dtype=np.int8)
+    paths = np.array(
+        [
+            [[0, 0], [4, 4]],
+            [[0, 1], [4, 3]],
+            [[0, 2], [4, 2]],
+            [[0, 2], [4, 2]],
+        ]
+    )
+    result = validate_paths(grid, paths, goals=paths[-1])
+    assert result["ok"] and result["success"]
+    assert result["first_error"] is None
+    print("✓ PASSED\n")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("RUNNING STRICT TESTS FOR core/validate.py")
+    print("=" * 60 + "\n")
+
+    tests = [
+        test_matches_reference,
+        test_swap_pass_matches_brute_force,
+        test_chunked_matches_whole,
+        test_fail_fast,
+        test_parallel_matches_serial,
+        test_incremental_validator,
+        test_action_encoding,
+        test_conflict_listing,
+        test_first_error_priority,
+        test_clean_paths_ok,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"✗ FAILED: {e}\n")
+            failed += 1
+        except Exception as e:
+            print(f"✗ ERROR: {e}\n")
+            import traceback
+            traceback.print_exc()
+            failed += 1
+
+    print("=" * 60)
+    print(f"TEST SUMMARY: {passed} passed, {failed} failed")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
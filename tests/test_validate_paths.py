@@ -5,6 +5,7 @@ Strict tests for validate_paths.py
 
 import sys
 import subprocess
+import tempfile
 import numpy as np
 from pathlib import Path
 
@@ -171,18 +172,19 @@ def test_different_connectivity():
     test_file = Path(__file__).parent / "test_paths_conn.npy"
     create_test_paths_file(test_file, (10, 5, 2), valid=True)
     
-    for connectivity in ["4", "8"]:
-        result = subprocess.run(
-            ["python", "-m", "scripts.validate_paths", str(test_file), "--map", "den312d", "--connectivity", connectivity],
-            cwd=Path(__file__).parent.parent,
-            capture_output=True,
-            text=True
-        )
-        print(f"Connectivity {connectivity}:")
-        print(result.stdout)
-        assert result.returncode == 0
-    
-    test_file.unlink()  # Cleanup
+    try:
+        for connectivity in ["4", "8"]:
+            result = subprocess.run(
+                ["python", "-m", "scripts.validate_paths", str(test_file), "--map", "den312d", "--connectivity", connectivity],
+                cwd=Path(__file__).parent.parent,
+                capture_output=True,
+                text=True
+            )
+            print(f"Connectivity {connectivity}:")
+            print(result.stdout)
+            assert result.returncode == 0
+    finally:
+        test_file.unlink()  # Cleanup
     print("✓ PASSED\n")
 
 
@@ -223,24 +225,55 @@ def test_different_maps():
     maps = ["empty-8-8", "empty-16-16"]
     test_file = Path(__file__).parent / "test_paths_maps.npy"
     
-    for map_name in maps:
-        # Adjust shape for smaller maps
-        if "8-8" in map_name:
-            create_test_paths_file(test_file, (5, 3, 2), valid=True, map_shape=(8, 8))
-        else:
-            create_test_paths_file(test_file, (5, 3, 2), valid=True, map_shape=(16, 16))
-        
-        result = subprocess.run(
-            ["python", "-m", "scripts.validate_paths", str(test_file), "--map", map_name],
-            cwd=Path(__file__).parent.parent,
-            capture_output=True,
-            text=True
-        )
-        print(f"Map {map_name}:")
-        print(result.stdout)
-        assert result.returncode == 0
+    try:
+        for map_name in maps:
+            # Adjust shape for smaller maps
+            if "8-8" in map_name:
+                create_test_paths_file(test_file, (5, 3, 2), valid=True, map_shape=(8, 8))
+            else:
+                create_test_paths_file(test_file, (5, 3, 2), valid=True, map_shape=(16, 16))
+            
+            result = subprocess.run(
+                ["python", "-m", "scripts.validate_paths", str(test_file), "--map", map_name],
+                cwd=Path(__file__).parent.parent,
+                capture_output=True,
+                text=True
+            )
+            print(f"Map {map_name}:")
+            print(result.stdout)
+            assert result.returncode == 0
+    finally:
+        test_file.unlink(missing_ok=True)  # Cleanup
+    print("✓ PASSED\n")
+
+
+def test_npz_uses_stored_motion():
+    """An actions .npz is checked against its stored motion by default"""
+    print("=" * 60)
+    print("TEST: .npz validated with the file's motion")
+    print("=" * 60)
     
-    test_file.unlink()  # Cleanup
+    from core.actions import encode_actions, save_actions
+    
+    paths = np.array([[[0, 0]], [[1, 1]], [[2, 2]]], dtype=np.int32)  # diagonal
+    starts, actions = encode_actions(paths, motion="8")
+    with tempfile.TemporaryDirectory() as tmp:
+        map_file = Path(tmp) / "empty-4-4.map"
+        map_file.write_text("type octile\nheight 4\nwidth 4\nmap\n" + "....\n" * 4)
+        test_file = Path(tmp) / "diag.npz"
+        save_actions(test_file, starts, actions, motion="8")
+        
+        for extra, illegal in [([], 0), (["--connectivity", "4"], 2)]:
+            result = subprocess.run(
+                ["python", "-m", "scripts.validate_paths", str(test_file),
+                 "--map", "empty-4-4", "--map_path", str(map_file)] + extra,
+                cwd=Path(__file__).parent.parent,
+                capture_output=True,
+                text=True
+            )
+            print(result.stdout)
+            assert f"Illegal moves           : {illegal}" in result.stdout
+            assert ("differs from the file's motion=8" in result.stdout) == bool(extra)
     print("✓ PASSED\n")
 
 
@@ -258,6 +291,7 @@ if __name__ == "__main__":
         test_different_connectivity,
         test_wrong_shape,
         test_different_maps,
+        test_npz_uses_stored_motion,
     ]
     
     passed = 0